@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_user_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_picture_placeholder',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+    ]
@@ -12,7 +12,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from social_django.utils import load_strategy, load_backend
 
 from apps.chat.models import ChatSetting
-from apps.content.models import Tag
+from apps.content.tags import add_tags
 from apps.accounts.models import User
 
 
@@ -81,9 +81,7 @@ class RegisterSerializer(serializers.ModelSerializer):
         user.set_password(validated_data['password'])
         user.save()
         ChatSetting.objects.get_or_create(user=user)
-        for interest in interests:
-            tag, _ = Tag.objects.get_or_create(name=interest)
-            user.interests.add(tag)
+        add_tags(user, 'interests', interests)
 
         refresh: RefreshToken = RefreshToken.for_user(user)
         user.refresh = str(refresh)
@@ -1,8 +1,10 @@
 from rest_framework import serializers
 
 from apps.content.models import Tag
+from apps.content.tags import set_tags
 from apps.accounts.models import User, Follow, UserBlock
-from config.utils import TimestampField
+from apps.media.serializers import ImageVariantsField
+from config.utils import DynamicFieldsMixin, TimestampField
 
 
 class InterestSerializer(serializers.ModelSerializer):
@@ -12,20 +14,25 @@ class InterestSerializer(serializers.ModelSerializer):
         fields = ('id', 'name')
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     interest_list = serializers.ListField(child=serializers.CharField(), write_only=True, required=False)
     interests = InterestSerializer(many=True, read_only=True)
     is_following = serializers.SerializerMethodField()
     can_message = serializers.SerializerMethodField(read_only=True)
     is_blocked = serializers.SerializerMethodField(read_only=True)
+    profile_picture_variants = ImageVariantsField('profile_picture', 'avatar')
+    cover_image_variants = ImageVariantsField('cover_image', 'cover')
 
     class Meta:
         model = User
         fields = [
             'id', 'username', 'first_name', 'last_name', 'email', 'bio', 'birth_date', 'age', 'profile_picture',
-            'cover_image', 'post_count', 'is_following', 'follower_count', 'following_count', 'subscriber_count',
-            'interest_list', 'interests', 'can_message', 'is_blocked'
+            'profile_picture_variants', 'profile_picture_placeholder', 'cover_image', 'cover_image_variants',
+            'post_count', 'is_following', 'follower_count', 'following_count', 'subscriber_count', 'interest_list',
+            'interests', 'can_message', 'is_blocked'
         ]
+        expandable_fields = ('interests',)
+        prefetch_related_fields = ('interests',)
 
     def get_is_following(self, obj) -> bool:
         request = self.context.get('request', None)
@@ -51,18 +58,20 @@ class UserSerializer(serializers.ModelSerializer):
         interests = validated_data.pop('interest_list', None)
         instance = super().update(instance, validated_data)
         if interests:
-            instance.interests.clear()
-            for interest in interests:
-                tag, _ = Tag.objects.get_or_create(name=interest)
-                instance.interests.add(tag)
+            set_tags(instance, 'interests', interests)
         return instance
 
 
 class UserListSerializer(serializers.ModelSerializer):
+    profile_picture_variants = ImageVariantsField('profile_picture', 'avatar')
+    cover_image_variants = ImageVariantsField('cover_image', 'cover')
 
     class Meta:
         model = User
-        fields = ('id', 'username', 'first_name', 'last_name', 'email', 'profile_picture', 'cover_image')
+        fields = (
+            'id', 'username', 'first_name', 'last_name', 'email', 'profile_picture', 'profile_picture_variants',
+            'profile_picture_placeholder', 'cover_image', 'cover_image_variants'
+        )
 
 
 class FollowSerializer(serializers.ModelSerializer):
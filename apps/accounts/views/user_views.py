@@ -9,6 +9,7 @@ from drf_spectacular.utils import extend_schema, OpenApiParameter
 from apps.accounts.filters import UserFilter
 from apps.accounts.serializers import UserSerializer, UserListSerializer
 from apps.accounts.models import User
+from config.utils import DYNAMIC_FIELDS_PARAMETERS
 
 USER_MANUAL_PARAMETERS = [
     OpenApiParameter('search', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description="Searching"),
@@ -24,7 +25,8 @@ class ProfileAPIView(APIView):
     @extend_schema(
         responses={200: UserSerializer},
         tags=['Profile'],
-        description='Get profile info'
+        description='Get profile info',
+        parameters=DYNAMIC_FIELDS_PARAMETERS
     )
     def get(self, request):
         serializer = self.serializer_class(request.user, context={'request': request})
@@ -80,7 +82,8 @@ class UserProfileAPIView(APIView):
     @extend_schema(
         responses={200: UserSerializer},
         tags=['User'],
-        description='Get profile info'
+        description='Get profile info',
+        parameters=DYNAMIC_FIELDS_PARAMETERS
     )
     def get(self, request, username):
         user = get_object_or_404(User, username=username)
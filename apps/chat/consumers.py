@@ -1,11 +1,13 @@
 import json
 from urllib.parse import urlunparse
 
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from django.http import HttpRequest
 
 from apps.chat.models import Chat, Message, MessageRead
 from apps.chat.serializers import MessageSerializer
+from apps.media.uploads import claim_message_media
 
 
 class CustomHttpRequest(HttpRequest):
@@ -51,6 +53,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
         media = text_data_json.get('media', None)
         media_type = text_data_json.get('media_type', None)
         media_aspect_ratio = text_data_json.get('media_aspect_ratio', None)
+        if media and not await database_sync_to_async(claim_message_media)(self.user, media):
+            media = None
         if message_text or media:
             message = await Message.objects.acreate(
                 chat=self.chat,
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-18 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0010_message_thumbnail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['chat', '-created_at', '-id'], name='messages_chat_id_bd03ea_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0011_message_messages_chat_id_bd03ea_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chat',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0012_chat_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='media_width',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='media_height',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='media_duration',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='media_codec',
+            field=models.CharField(max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='media_bitrate',
+            field=models.PositiveIntegerField(null=True),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0013_message_media_probe'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='media_placeholder',
+            field=models.CharField(max_length=100, null=True),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0014_message_media_placeholder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='media_waveform',
+            field=models.BinaryField(null=True),
+        ),
+    ]
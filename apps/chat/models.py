@@ -8,6 +8,7 @@ class Chat(models.Model):
     id = CustomAutoField(primary_key=True, editable=False, start_value=10 ** 6 + 1)
     name = models.CharField(max_length=255, null=True)
     image = models.ImageField(upload_to='chats/images/', null=True)
+    image_variants = models.JSONField(default=dict, blank=True)
     owner = models.ForeignKey(User, related_name='owned_chats', on_delete=models.SET_NULL, null=True, db_index=True)
     participants = models.ManyToManyField(User, related_name='chats')
     is_group = models.BooleanField(default=False)
@@ -38,7 +39,14 @@ class Message(models.Model):
     media = models.FileField(upload_to='messages/media/', null=True)
     media_type = models.CharField(max_length=10, choices=MessageMediaTypeEnum, null=True)
     thumbnail = models.FileField(upload_to='messages/media/', null=True)
+    media_placeholder = models.CharField(max_length=100, null=True)
+    media_waveform = models.BinaryField(null=True)
     media_aspect_ratio = models.FloatField(null=True)
+    media_width = models.PositiveIntegerField(null=True)
+    media_height = models.PositiveIntegerField(null=True)
+    media_duration = models.FloatField(null=True)
+    media_codec = models.CharField(max_length=32, null=True)
+    media_bitrate = models.PositiveIntegerField(null=True)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
@@ -46,6 +54,9 @@ class Message(models.Model):
         verbose_name = 'message'
         verbose_name_plural = 'messages'
         ordering = ('-created_at',)
+        indexes = [
+            models.Index(fields=['chat', '-created_at', '-id']),
+        ]
 
 
 class MessageRead(models.Model):
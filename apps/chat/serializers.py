@@ -1,6 +1,3 @@
-import ffmpeg
-from django.core.files.storage import default_storage
-from django.core.files.base import File
 from django.core.files.uploadedfile import TemporaryUploadedFile
 from rest_framework import serializers
 from rest_framework.generics import get_object_or_404
@@ -11,21 +8,26 @@ from .models import Chat, Message, ChatSetting
 from apps.accounts.models import User, Follow
 from apps.accounts.serializers import UserListSerializer
 from apps.content_plan.models import Subscription, ContentPlan
+from apps.media.blobs import store_blob
+from apps.media.processors import extract_media_thumbnail
+from apps.media.serializers import ImageVariantsField, WaveformField, get_variant_urls
+from apps.media.uploads import record_message_upload
 
 
 class MessageSerializer(serializers.ModelSerializer):
     sender_username = serializers.CharField(read_only=True, source='sender.username')
+    media_waveform = WaveformField()
     created_at = TimestampField(read_only=True)
     
     class Meta:
         model = Message
         fields = [
-            'id', 'sender_username', 'content', 'media', 'media_type', 'thumbnail', 'media_aspect_ratio', 'created_at'
+            'id', 'sender_username', 'content', 'media', 'media_type', 'thumbnail', 'media_placeholder',
+            'media_waveform', 'media_aspect_ratio', 'media_width', 'media_height', 'media_duration', 'created_at'
         ]
 
 
 class PaginatedMessageSerializer(serializers.Serializer):
-    count = serializers.IntegerField(help_text="Total number of items")
     next = serializers.CharField(allow_null=True, help_text="URL of the next page", required=False)
     previous = serializers.CharField(allow_null=True, help_text="URL of the previous page", required=False)
     results = MessageSerializer(many=True, read_only=True)
@@ -38,19 +40,26 @@ class ChatSerializer(serializers.ModelSerializer):
     owner = UserListSerializer(read_only=True)
     name = serializers.SerializerMethodField(read_only=True)
     image = serializers.SerializerMethodField(read_only=True)
+    image_variants = serializers.SerializerMethodField(read_only=True)
     created_at = TimestampField(read_only=True)
 
     class Meta:
         model = Chat
         fields = [
-            'id', 'name', 'image', 'owner', 'participants', 'is_group', 'is_request', 'created_at'
+            'id', 'name', 'image', 'image_variants', 'owner', 'participants', 'is_group', 'is_request', 'created_at'
         ]
 
+    def get_participant(self, obj) -> User | None:
+        """The other participant of a direct chat, looked up once per chat."""
+        if not hasattr(obj, '_participant'):
+            user = self.context['request'].user
+            obj._participant = obj.participants.exclude(id=user.id).first()
+        return obj._participant
+
     def get_name(self, obj) -> str:
         if obj.is_group:
             return obj.name
-        user = self.context['request'].user
-        participant = obj.participants.exclude(id=user.id).first()
+        participant = self.get_participant(obj)
         if participant and participant.last_name:
             return f'{participant.first_name} {participant.last_name}'
         return participant.first_name if participant else 'Noname'
@@ -60,12 +69,19 @@ class ChatSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if obj.is_group:
             return request.build_absolute_uri(obj.image.url) if obj.image else None
-        user = self.context['request'].user
-        participant = obj.participants.exclude(id=user.id).first()
+        participant = self.get_participant(obj)
         if participant and participant.profile_picture:
             return request.build_absolute_uri(participant.profile_picture.url)
         return None
 
+    @extend_schema_field(ImageVariantsField('image', 'avatar'))
+    def get_image_variants(self, obj):
+        request = self.context.get('request')
+        if obj.is_group:
+            return get_variant_urls(obj, 'image', 'avatar', request)
+        participant = self.get_participant(obj)
+        return get_variant_urls(participant, 'profile_picture', 'avatar', request) if participant else None
+
 
 class ChatListSerializer(ChatSerializer):
     TYPE = [
@@ -82,7 +98,8 @@ class ChatListSerializer(ChatSerializer):
     class Meta:
         model = Chat
         fields = [
-            'id', 'is_group', 'username', 'type', 'name', 'image', 'new_message_count', 'is_request', 'last_message', 'created_at'
+            'id', 'is_group', 'username', 'type', 'name', 'image', 'image_variants', 'new_message_count', 'is_request',
+            'last_message', 'created_at'
         ]
 
     def validate_username(self, value):
@@ -168,14 +185,13 @@ class MediaSerializer(serializers.Serializer):
     media = serializers.FileField()
 
     def create(self, validated_data):
+        record_message_upload(validated_data['user'], validated_data['media'])
         return validated_data
 
     def validate(self, attrs):
         temporary_file: TemporaryUploadedFile = attrs.get('media')
-        file_path = default_storage.save(f'messages/{temporary_file.name}', temporary_file)
-        file: File = default_storage.open(file_path)
-        thumbnail_path = file.name + '_thumbnail.jpg'
-        ffmpeg.input(file.name, ss=1).output(thumbnail_path, vframes=1).run(capture_stdout=True, capture_stderr=True)
+        file_path = store_blob(temporary_file).name
+        extract_media_thumbnail(file_path)
         return {'media': file_path}
 
 
@@ -1,5 +1,4 @@
 from django.db.models import Q
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
@@ -11,7 +10,8 @@ from apps.accounts.models import UserBlock
 from apps.chat.models import Chat, Message, MessageRead
 from apps.chat.serializers import ChatSerializer, ChatListSerializer, CreateGroupSerializer, ChatSettingSerializer, \
     MessageSerializer, PaginatedMessageSerializer
-from config.utils import PAGINATION_PARAMETERS
+from config.pagination import KeysetPagination
+from config.utils import CURSOR_PAGINATION_PARAMETERS
 
 
 class ChatView(APIView):
@@ -191,12 +191,11 @@ class MessageListAPIView(APIView):
         responses={200: PaginatedMessageSerializer()},
         tags=['Chat'],
         description='Get chat messages',
-        parameters=PAGINATION_PARAMETERS
+        parameters=CURSOR_PAGINATION_PARAMETERS
     )
     def get(self, request, chat_id):
         queryset = Message.objects.filter(chat__id=chat_id)
-        paginator = PageNumberPagination()
-        paginator.page_size_query_param = 'page_size'
+        paginator = KeysetPagination()
         paginated_queryset = paginator.paginate_queryset(queryset, request)
         serializer = MessageSerializer(paginated_queryset, many=True, context={'request': request})
         return paginator.get_paginated_response(serializer.data)
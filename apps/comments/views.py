@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
@@ -34,7 +35,9 @@ class CommentAPIView(APIView):
         content = get_object_or_404(Content, id=content_id)
         serializer = CommentSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
-            serializer.save(user=request.user, content=content)
+            with transaction.atomic():
+                serializer.save(user=request.user, content=content)
+                Content.update_counter(content.id, 'comment_count', 1)
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
@@ -73,5 +76,8 @@ class CommentDetailAPIView(APIView):
     )
     def delete(self, request, comment_id):
         comment = get_object_or_404(Comment, id=comment_id)
-        comment.delete()
+        with transaction.atomic():
+            deleted, _ = Comment.objects.filter(id=comment.id).delete()
+            if deleted:
+                Content.update_counter(comment.content_id, 'comment_count', -deleted)
         return Response(status=status.HTTP_204_NO_CONTENT)
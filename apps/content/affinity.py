@@ -0,0 +1,117 @@
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from scipy import sparse
+
+from apps.accounts.models import User
+from apps.content.models import Content, ContentRecommendation, Like, SavedContent
+
+INTEREST_WEIGHT = 1.0
+LIKE_WEIGHT = 0.5
+SAVE_WEIGHT = 1.0
+
+
+def to_array(pairs) -> np.ndarray:
+    return np.fromiter((value for pair in pairs for value in pair), dtype=np.int64).reshape(-1, 2)
+
+
+def to_matrix(pairs: np.ndarray, row_ids: np.ndarray, col_ids: np.ndarray) -> sparse.csr_matrix:
+    """
+    Sparse matrix with one entry per ``(row id, column id)`` pair, duplicates summed. ``row_ids`` and ``col_ids``
+    are sorted id arrays that give the axes; pairs outside them are dropped.
+    """
+    shape = (len(row_ids), len(col_ids))
+    if not len(pairs) or not all(shape):
+        return sparse.csr_matrix(shape, dtype=np.float64)
+    rows = np.searchsorted(row_ids, pairs[:, 0]).clip(max=len(row_ids) - 1)
+    cols = np.searchsorted(col_ids, pairs[:, 1]).clip(max=len(col_ids) - 1)
+    valid = (row_ids[rows] == pairs[:, 0]) & (col_ids[cols] == pairs[:, 1])
+    values = np.ones(valid.sum(), dtype=np.float64)
+    return sparse.coo_matrix((values, (rows[valid], cols[valid])), shape=shape).tocsr()
+
+
+def normalize_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    return (sparse.diags(inverse) @ matrix).tocsr()
+
+
+def get_content_matrix(since) -> tuple[np.ndarray, np.ndarray, sparse.csr_matrix]:
+    """Recent contents, their tags and the L2-normalized content x tag matrix."""
+    links = Content.tags.through.objects.filter(
+        content__type=Content.ContentType.CONTENT, content__created_at__gte=since
+    )
+    links = to_array(links.values_list('content_id', 'tag_id'))
+    content_ids, tag_ids = np.unique(links[:, 0]), np.unique(links[:, 1])
+    return content_ids, tag_ids, normalize_rows(to_matrix(links, content_ids, tag_ids))
+
+
+def get_user_matrix(user_ids: np.ndarray, tag_ids: np.ndarray) -> tuple[sparse.csr_matrix, np.ndarray]:
+    """
+    The L2-normalized user x tag affinity of a batch of users, made of their interests and the tags of what they
+    liked and saved, plus all ``(user_id, content_id)`` engagement pairs.
+    """
+    interests = User.interests.through.objects.filter(user_id__in=user_ids.tolist())
+    matrix = INTEREST_WEIGHT * to_matrix(to_array(interests.values_list('user_id', 'tag_id')), user_ids, tag_ids)
+    engaged = []
+    for weight, queryset in ((LIKE_WEIGHT, Like.objects.all()), (SAVE_WEIGHT, SavedContent.objects.all())):
+        queryset = queryset.filter(user_id__in=user_ids.tolist())
+        edges = to_array(queryset.values_list('user_id', 'content_id'))
+        links = Content.tags.through.objects.filter(content_id__in=queryset.values('content_id'))
+        links = to_array(links.values_list('content_id', 'tag_id'))
+        engaged_ids = np.unique(edges[:, 1])
+        matrix = matrix + weight * (to_matrix(edges, user_ids, engaged_ids) @ to_matrix(links, engaged_ids, tag_ids))
+        engaged.append(edges)
+    matrix = sparse.csr_matrix(matrix)
+    matrix.data = np.log1p(matrix.data)
+    return normalize_rows(matrix), np.concatenate(engaged)
+
+
+def score_users(user_ids: np.ndarray, content_ids: np.ndarray, tag_ids: np.ndarray,
+                content_matrix: sparse.csr_matrix, since) -> list[tuple[int, int, float]]:
+    """Top RECOMMENDATION_LIMIT ``(user_id, content_id, score)`` cosine scores, skipping own and engaged contents."""
+    user_matrix, engaged = get_user_matrix(user_ids, tag_ids)
+    scores = (user_matrix @ content_matrix.T).tocsr()
+    own = Content.objects.filter(user_id__in=user_ids.tolist(), created_at__gte=since)
+    excluded = np.concatenate([engaged, to_array(own.values_list('user_id', 'id'))])
+    scores = (scores - scores.multiply(to_matrix(excluded, user_ids, content_ids) > 0)).tocsr()
+    scores.eliminate_zeros()
+
+    limit = settings.RECOMMENDATION_LIMIT
+    results = []
+    for row, user_id in enumerate(user_ids.tolist()):
+        start, end = scores.indptr[row], scores.indptr[row + 1]
+        values, columns = scores.data[start:end], scores.indices[start:end]
+        if len(values) > limit:
+            top = np.argpartition(-values, limit - 1)[:limit]
+            values, columns = values[top], columns[top]
+        results.extend(zip([user_id] * len(values), content_ids[columns].tolist(), values.tolist()))
+    return results
+
+
+def compute_recommendations(users) -> int:
+    """Scores recent contents for the given users batch by batch and replaces their stored recommendations."""
+    since = timezone.now() - settings.DISCOVER_WINDOW
+    content_ids, tag_ids, content_matrix = get_content_matrix(since)
+    all_user_ids = np.fromiter(users.order_by('id').values_list('id', flat=True), dtype=np.int64)
+    batch_size = settings.RECOMMENDATION_BATCH_SIZE
+    written = 0
+    for offset in range(0, len(all_user_ids), batch_size):
+        user_ids = all_user_ids[offset:offset + batch_size]
+        rows = score_users(user_ids, content_ids, tag_ids, content_matrix, since)
+        with transaction.atomic():
+            ContentRecommendation.objects.filter(user_id__in=user_ids.tolist()).delete()
+            ContentRecommendation.objects.bulk_create(
+                [ContentRecommendation(user_id=user_id, content_id=cid, score=score) for user_id, cid, score in rows],
+                batch_size=batch_size
+            )
+        written += len(rows)
+    return written
+
+
+def get_recommended_scores(user: User) -> dict[int, float]:
+    recommendations = ContentRecommendation.objects.filter(
+        user=user, content__created_at__gte=timezone.now() - settings.DISCOVER_WINDOW
+    )
+    return dict(recommendations.values_list('content_id', 'score')[:settings.DISCOVER_SOURCE_LIMIT])
@@ -0,0 +1,97 @@
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.accounts.models import Follow, User
+from apps.content.affinity import get_recommended_scores
+from apps.content.feed_cache import feed_cache
+from apps.content.models import Content, DiscoverCandidate, TrendingContent
+from apps.content.seen import get_seen_contents
+
+RECENCY_WEIGHT = 0.4
+ENGAGEMENT_WEIGHT = 0.35
+AFFINITY_WEIGHT = 0.25
+FOLLOW_GRAPH_BONUS = 0.1
+
+RANKED_ORDERING = ('-score', '-id')
+RECENT_ORDERING = ('-created_at', '-id')
+
+
+def get_candidate_pool(user: User):
+    since = timezone.now() - settings.DISCOVER_WINDOW
+    return Content.objects.filter(type=Content.ContentType.CONTENT, created_at__gte=since).exclude(user=user)
+
+
+def collect_candidate_ids(user: User, interest_ids: set[int]) -> tuple[set[int], set[int]]:
+    """Candidate ids from interests, trending content and the follow graph, plus the follow-graph subset."""
+    pool = get_candidate_pool(user)
+    limit = settings.DISCOVER_SOURCE_LIMIT
+    trending = pool.filter(trending__isnull=False).order_by('trending__rank')
+    if not TrendingContent.objects.exists():
+        trending = pool.order_by('-like_count', '-comment_count')
+    candidate_ids = set(trending.values_list('id', flat=True)[:limit])
+    if interest_ids:
+        candidate_ids.update(pool.filter(tags__in=interest_ids).values_list('id', flat=True)[:limit])
+    followed_ids = Follow.objects.filter(follower=user).values('following_id')
+    social_ids = set(pool.filter(likes__user_id__in=followed_ids).values_list('id', flat=True)[:limit])
+    candidate_ids.update(social_ids)
+    return candidate_ids, social_ids
+
+
+def score_candidates(user: User) -> list[tuple[int, float]]:
+    interest_ids = set(user.interests.values_list('id', flat=True))
+    candidate_ids, social_ids = collect_candidate_ids(user, interest_ids)
+    recommended = get_recommended_scores(user)
+    candidate_ids.update(recommended)
+    seen_contents = get_seen_contents(user)
+    candidate_ids = {content_id for content_id in candidate_ids if content_id not in seen_contents}
+    if not candidate_ids:
+        return []
+
+    content_tags = defaultdict(set)
+    tag_links = Content.tags.through.objects.filter(content_id__in=candidate_ids)
+    for content_id, tag_id in tag_links.values_list('content_id', 'tag_id'):
+        content_tags[content_id].add(tag_id)
+    rows = Content.objects.filter(id__in=candidate_ids).values_list('id', 'created_at', 'like_count', 'comment_count')
+    rows = list(rows)
+
+    now = timezone.now()
+    half_life = settings.DISCOVER_RECENCY_HALF_LIFE.total_seconds()
+    max_engagement = max(math.log1p(likes + 2 * comments) for _, _, likes, comments in rows)
+    scores = []
+    for content_id, created_at, likes, comments in rows:
+        recency = 0.5 ** ((now - created_at).total_seconds() / half_life)
+        engagement = math.log1p(likes + 2 * comments) / max_engagement if max_engagement else 0
+        tags = content_tags[content_id]
+        affinity = len(tags & interest_ids) / len(tags) if tags else 0
+        affinity = max(affinity, recommended.get(content_id, 0))
+        score = RECENCY_WEIGHT * recency + ENGAGEMENT_WEIGHT * engagement + AFFINITY_WEIGHT * affinity
+        if content_id in social_ids:
+            score += FOLLOW_GRAPH_BONUS
+        scores.append((content_id, score))
+    scores.sort(key=lambda item: item[1], reverse=True)
+    return scores[:settings.DISCOVER_CANDIDATE_LIMIT]
+
+
+def refresh_candidates(user: User) -> int:
+    candidates = [
+        DiscoverCandidate(user=user, content_id=content_id, score=score)
+        for content_id, score in score_candidates(user)
+    ]
+    with transaction.atomic():
+        DiscoverCandidate.objects.filter(user=user).delete()
+        DiscoverCandidate.objects.bulk_create(candidates)
+    feed_cache.bump(user.id)
+    return len(candidates)
+
+
+def get_discover_queryset(user: User):
+    """Returns the discover queryset and the ordering it has to be paginated with."""
+    if DiscoverCandidate.objects.filter(user=user).exists():
+        ranked = Content.objects.filter(discover_candidates__user=user)
+        return ranked.annotate(score=F('discover_candidates__score')), RANKED_ORDERING
+    return Content.objects.filter(type=Content.ContentType.CONTENT).exclude(user=user), RECENT_ORDERING
@@ -0,0 +1,70 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class FeedPageCache:
+    """
+    Serialized feed pages keyed by viewer, feed version and query string.
+
+    Every viewer has a version number that is part of the page keys, so invalidation is a single version bump and
+    stale pages simply age out of the LRU-bounded FEED_CACHE_ALIAS cache. Versions and stats live in that cache as
+    well: the default local-memory backend only keeps them coherent within one process, so deployments running
+    several workers must point FEED_CACHE_ALIAS at a shared backend such as Redis or Memcached.
+    """
+    stats_keys = ('hits', 'misses')
+
+    def __init__(self, alias=None):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias or settings.FEED_CACHE_ALIAS]
+
+    @staticmethod
+    def get_version_key(user_id) -> str:
+        return f'feed:version:{user_id}'
+
+    def get_version(self, user_id) -> int:
+        key = self.get_version_key(user_id)
+        version = self.cache.get(key)
+        if version is None:
+            self.cache.add(key, time.time_ns(), None)
+            version = self.cache.get(key)
+        return version
+
+    def bump(self, *user_ids) -> None:
+        version = time.time_ns()
+        self.cache.set_many({self.get_version_key(user_id): version for user_id in user_ids}, None)
+
+    def get_page_key(self, request, feed) -> str:
+        query = '&'.join(sorted(f'{key}={value}' for key, value in request.query_params.items()))
+        digest = hashlib.md5(query.encode()).hexdigest()
+        return f'feed:page:{feed}:{request.user.id}:{self.get_version(request.user.id)}:{digest}'
+
+    def get(self, request, feed):
+        data = self.cache.get(self.get_page_key(request, feed))
+        self.record('hits' if data is not None else 'misses')
+        return data
+
+    def set(self, request, feed, data) -> None:
+        self.cache.set(self.get_page_key(request, feed), data, settings.FEED_CACHE_TIMEOUT)
+
+    def record(self, name) -> None:
+        key = f'feed:stats:{name}'
+        self.cache.add(key, 0, None)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, 1, None)
+
+    def stats(self) -> dict:
+        values = self.cache.get_many([f'feed:stats:{name}' for name in self.stats_keys])
+        hits, misses = (values.get(f'feed:stats:{name}', 0) for name in self.stats_keys)
+        total = hits + misses
+        return {'hits': hits, 'misses': misses, 'hit_rate': hits / total if total else 0.0}
+
+
+feed_cache = FeedPageCache()
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.content.affinity import compute_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Score recent contents against the tag affinity of recently active users'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--active-days', type=int, default=30, help='Only users who logged in this recently')
+        parser.add_argument('--username', help='Score a single user')
+
+    def handle(self, *args, **options):
+        if options['username']:
+            users = User.objects.filter(username=options['username'])
+        else:
+            users = User.objects.filter(last_login__gte=timezone.now() - timedelta(days=options['active_days']))
+        written = compute_recommendations(users)
+        self.stdout.write(self.style.SUCCESS(f'Stored {written} content recommendations'))
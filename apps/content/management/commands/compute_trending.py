@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.content.trending import refresh_trending
+
+
+class Command(BaseCommand):
+    help = 'Recompute the time-decayed trending tag and content rankings'
+
+    def handle(self, *args, **options):
+        refresh_trending()
+        self.stdout.write(self.style.SUCCESS('Trending rankings updated'))
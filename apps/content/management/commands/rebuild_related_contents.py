@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.content.models import Content
+from apps.content.related import refresh_related
+
+
+class Command(BaseCommand):
+    help = 'Recompute the related content lists, picking up co-likes gathered since the contents were posted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Only contents posted this recently')
+
+    def handle(self, *args, **options):
+        contents = Content.objects.filter(type=Content.ContentType.CONTENT).only('id', 'main_tag_id')
+        if options['days']:
+            contents = contents.filter(created_at__gte=timezone.now() - timedelta(days=options['days']))
+        rebuilt = 0
+        for content in contents.order_by('id').iterator():
+            refresh_related(content)
+            rebuilt += 1
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt related contents for {rebuilt} contents'))
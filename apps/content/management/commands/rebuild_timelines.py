@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from apps.accounts.models import Follow
+from apps.content.models import TimelineEntry
+from apps.content.timeline import backfill_timeline, cap_timeline
+
+
+class Command(BaseCommand):
+    help = 'Backfill home timelines from the follow graph and cap them to TIMELINE_MAX_LENGTH'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cap-only', action='store_true', help='Only trim timelines that grew too long')
+
+    def handle(self, *args, **options):
+        if not options['cap_only']:
+            follows = Follow.objects.values_list('follower_id', 'following_id').order_by('id')
+            for follower_id, following_id in follows.iterator():
+                backfill_timeline(follower_id, following_id)
+        user_ids = TimelineEntry.objects.values_list('user_id', flat=True).distinct().order_by()
+        for user_id in user_ids.iterator():
+            cap_timeline(user_id)
+        self.stdout.write(self.style.SUCCESS('Timelines rebuilt'))
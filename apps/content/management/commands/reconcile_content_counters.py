@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from apps.comments.models import Comment
+from apps.content.models import Content, Like
+
+
+class Command(BaseCommand):
+    help = 'Recalculate drifted like and comment counters of contents in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        like_totals = Like.objects.filter(content=OuterRef('pk')).order_by().values('content')
+        like_totals = like_totals.annotate(total=Count('id')).values('total')
+        comment_totals = Comment.objects.filter(content=OuterRef('pk')).order_by().values('content')
+        comment_totals = comment_totals.annotate(total=Count('id')).values('total')
+        actual_counts = {
+            'like_count': Coalesce(Subquery(like_totals), 0),
+            'comment_count': Coalesce(Subquery(comment_totals), 0),
+        }
+
+        last_id = 0
+        reconciled = 0
+        while True:
+            batch_ids = Content.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)
+            batch_ids = list(batch_ids[:options['batch_size']])
+            if not batch_ids:
+                break
+            last_id = batch_ids[-1]
+            drifted = Content.objects.filter(id__in=batch_ids).exclude(**actual_counts)
+            reconciled += drifted.update(**actual_counts)
+        self.stdout.write(self.style.SUCCESS(f'Reconciled {reconciled} contents'))
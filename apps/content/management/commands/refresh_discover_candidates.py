@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.content.discover import refresh_candidates
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the ranked discover candidate lists of recently active users'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--active-days', type=int, default=30, help='Only users who logged in this recently')
+        parser.add_argument('--username', help='Refresh a single user')
+
+    def handle(self, *args, **options):
+        if options['username']:
+            users = User.objects.filter(username=options['username'])
+        else:
+            users = User.objects.filter(last_login__gte=timezone.now() - timedelta(days=options['active_days']))
+        refreshed = 0
+        for user in users.order_by('id').iterator():
+            refresh_candidates(user)
+            refreshed += 1
+        self.stdout.write(self.style.SUCCESS(f'Refreshed discover candidates for {refreshed} users'))
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.6 on 2026-10-18 20:26
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Content = apps.get_model('content', 'Content')
+    Like = apps.get_model('content', 'Like')
+    Comment = apps.get_model('comments', 'Comment')
+    like_totals = Like.objects.filter(content=OuterRef('pk')).order_by().values('content')
+    comment_totals = Comment.objects.filter(content=OuterRef('pk')).order_by().values('content')
+    Content.objects.update(
+        like_count=Coalesce(Subquery(like_totals.annotate(total=Count('id')).values('total')), 0),
+        comment_count=Coalesce(Subquery(comment_totals.annotate(total=Count('id')).values('total')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0003_alter_comment_content'),
+        ('content', '0011_timelineentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='content',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='content',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
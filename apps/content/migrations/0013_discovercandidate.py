@@ -0,0 +1,34 @@
+# Generated by Django 5.0.6 on 2026-10-18 20:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0012_content_engagement_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiscoverCandidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('content', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='discover_candidates', to='content.content')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='discover_candidates', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'discover candidate',
+                'verbose_name_plural': 'discover candidates',
+                'db_table': 'content_discover_candidates',
+                'ordering': ('-score',),
+                'indexes': [models.Index(fields=['user', '-score'], name='content_dis_user_id_54c981_idx')],
+                'unique_together': {('user', 'content')},
+            },
+        ),
+    ]
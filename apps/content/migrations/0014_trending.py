@@ -0,0 +1,64 @@
+# Generated by Django 5.0.6 on 2026-10-18 20:27
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_like_created_at(apps, schema_editor):
+    # Existing likes have no time of their own. Dating them at their content lets them decay with it, instead of
+    # trending and co-like ranking treating every like ever made as made during the migration.
+    Content = apps.get_model('content', 'Content')
+    Like = apps.get_model('content', 'Like')
+    content_created_at = Content.objects.filter(pk=OuterRef('content')).values('created_at')
+    Like.objects.update(created_at=Subquery(content_created_at[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0013_discovercandidate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='like',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_like_created_at, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='TrendingContent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveIntegerField(db_index=True)),
+                ('computed_at', models.DateTimeField()),
+                ('content', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='trending', to='content.content')),
+            ],
+            options={
+                'verbose_name': 'trending content',
+                'verbose_name_plural': 'trending contents',
+                'db_table': 'content_trending_contents',
+                'ordering': ('rank',),
+            },
+        ),
+        migrations.CreateModel(
+            name='TrendingTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveIntegerField(db_index=True)),
+                ('computed_at', models.DateTimeField()),
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='trending', to='content.tag')),
+            ],
+            options={
+                'verbose_name': 'trending tag',
+                'verbose_name_plural': 'trending tags',
+                'db_table': 'content_trending_tags',
+                'ordering': ('rank',),
+            },
+        ),
+    ]
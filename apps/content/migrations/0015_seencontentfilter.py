@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-18 20:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0014_trending'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeenContentFilter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('current', models.BinaryField()),
+                ('previous', models.BinaryField(null=True)),
+                ('current_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='seen_content_filter', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'seen content filter',
+                'verbose_name_plural': 'seen content filters',
+                'db_table': 'content_seen_filters',
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.6 on 2026-10-18 20:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0016_content_type_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='content',
+            name='view_count',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ContentViewDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('views', models.PositiveBigIntegerField(default=0)),
+                ('content', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_views', to='content.content')),
+            ],
+            options={
+                'verbose_name': 'content daily views',
+                'verbose_name_plural': 'content daily views',
+                'db_table': 'content_views_daily',
+                'ordering': ('-date',),
+                'unique_together': {('content', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.6 on 2026-10-18 20:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0017_content_view_counts'),
+        ('content_plan', '0002_contentplan_trial_description_subscription'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='contents_user_id_20212b_idx'),
+        ),
+    ]
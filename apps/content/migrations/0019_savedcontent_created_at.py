@@ -0,0 +1,26 @@
+# Generated by Django 5.0.6 on 2026-10-18 20:39
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0018_content_user_created_at_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='savedcontent',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='savedcontent',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='content_sav_user_id_434e0f_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-18 20:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0019_savedcontent_created_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedContent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('content', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_entries', to='content.content')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_to', to='content.content')),
+            ],
+            options={
+                'verbose_name': 'related content',
+                'verbose_name_plural': 'related contents',
+                'db_table': 'content_related',
+                'ordering': ('-score',),
+                'indexes': [models.Index(fields=['content', '-score'], name='content_rel_content_6430de_idx')],
+                'unique_together': {('content', 'related')},
+            },
+        ),
+    ]
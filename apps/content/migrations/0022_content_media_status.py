@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 20:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0021_contentrecommendation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='content',
+            name='media_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=10),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 20:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0022_content_media_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='content',
+            name='stream',
+            field=models.FileField(null=True, upload_to='contents/'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.6 on 2026-10-18 21:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0024_content_media_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='content',
+            name='media_bitrate',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='content',
+            name='media_codec',
+            field=models.CharField(max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='content',
+            name='media_duration',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='content',
+            name='media_height',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='content',
+            name='media_width',
+            field=models.PositiveIntegerField(null=True),
+        ),
+    ]
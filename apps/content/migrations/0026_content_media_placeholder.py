@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0025_content_media_probe'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='content',
+            name='media_placeholder',
+            field=models.CharField(max_length=100, null=True),
+        ),
+    ]
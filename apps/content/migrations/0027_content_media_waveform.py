@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 21:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0026_content_media_placeholder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='content',
+            name='media_waveform',
+            field=models.BinaryField(null=True),
+        ),
+    ]
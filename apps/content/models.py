@@ -1,7 +1,6 @@
-import ffmpeg
 from django.db import models
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.db.models import F
+from django.db.models.functions import Greatest
 
 from apps.accounts.models import User
 from apps.content_plan.models import ContentPlan
@@ -36,6 +35,11 @@ class Content(models.Model):
         TEXT = 'text', 'Text'
         IMAGE = 'image', 'Image'
 
+    class MediaStatus(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        READY = 'ready', 'Ready'
+        FAILED = 'failed', 'Failed'
+
     id = CustomAutoField(primary_key=True, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='contents', db_index=True)
     text = models.CharField(max_length=255, null=True)
@@ -43,55 +47,61 @@ class Content(models.Model):
     media_preview = models.FileField(upload_to='contents/', null=True)
     media_type = models.CharField(max_length=10, choices=ContentMediaType, null=True)
     media_aspect_ratio = models.FloatField(null=True)
+    media_width = models.PositiveIntegerField(null=True)
+    media_height = models.PositiveIntegerField(null=True)
+    media_duration = models.FloatField(null=True)
+    media_codec = models.CharField(max_length=32, null=True)
+    media_bitrate = models.PositiveIntegerField(null=True)
+    media_status = models.CharField(max_length=10, choices=MediaStatus, default=MediaStatus.READY)
+    media_variants = models.JSONField(default=dict, blank=True)
+    media_placeholder = models.CharField(max_length=100, null=True)
+    media_waveform = models.BinaryField(null=True)
     thumbnail = models.FileField(upload_to='contents/', null=True)
+    stream = models.FileField(upload_to='contents/', null=True)
     content_plan = models.ForeignKey(ContentPlan, on_delete=models.SET_NULL, null=True, related_name='contents')
     banner = models.FileField(upload_to='banners/', null=True)
     type = models.CharField(max_length=10, choices=ContentType)
     main_tag = models.ForeignKey(Tag, on_delete=models.SET_NULL, null=True, related_name='main_contents')
     tags = models.ManyToManyField(Tag, related_name='contents', db_index=True)
     tagged_users = models.ManyToManyField(User, related_name='tagged_contents', db_index=True)
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    view_count = models.PositiveBigIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         db_table = 'contents'
         ordering = ('-created_at',)
+        indexes = [
+            models.Index(fields=['type', '-created_at', '-id']),
+            models.Index(fields=['user', '-created_at', '-id']),
+        ]
         verbose_name = 'content'
         verbose_name_plural = 'contents'
 
-    @property
-    def like_count(self) -> int:
-        return Like.objects.filter(content=self).count()
+    @staticmethod
+    def update_counter(content_id: int, field: str, delta: int) -> None:
+        Content.objects.filter(id=content_id).update(**{field: Greatest(F(field) + delta, 0)})
 
-    @property
-    def comment_count(self) -> int:
-        return self.comments.count()
-    
     def add_tags(self, tags: list[str]) -> None:
-        self.tags.clear()
-        for tag in tags:
-            tag_instance, _ = Tag.objects.get_or_create(name=tag)
-            self.tags.add(tag_instance)
+        from apps.content.tags import set_tags
+        set_tags(self, 'tags', tags)
 
     def __str__(self):
         return self.text if self.text else 'Untitled'
 
-@receiver(post_save, sender=Content)
-def content_post_save(sender, instance, created, **kwargs):
-    if created and instance.media and instance.media_type == 'video':
-        thumbnail_path = instance.media.path + '_thumbnail.jpg'
-        ffmpeg.input(instance.media.path, ss=1).output(thumbnail_path, vframes=1).run(capture_stdout=True,
-                                                                                 capture_stderr=True)
-        instance.thumbnail = str(instance.media) + '_thumbnail.jpg'
-        instance.save()
-
 
 class SavedContent(models.Model):
     id = CustomAutoField(primary_key=True, editable=False)
     content = models.ForeignKey(Content, on_delete=models.CASCADE, related_name='saved', db_index=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='saved', db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = 'content_saved'
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id']),
+        ]
         verbose_name = 'saved content'
         verbose_name_plural = 'saved contents'
 
@@ -103,6 +113,7 @@ class Like(models.Model):
     id = CustomAutoField(primary_key=True, editable=False)
     content = models.ForeignKey(Content, on_delete=models.CASCADE, related_name='likes', db_index=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='likes', db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         db_table = 'content_likes'
@@ -113,6 +124,149 @@ class Like(models.Model):
         return f'{self.user} likes {self.content}'
 
 
+class TimelineEntry(models.Model):
+    # Plain auto id: rows are written with bulk_create, which CustomAutoField can't number.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline_entries')
+    content = models.ForeignKey(Content, on_delete=models.CASCADE, related_name='timeline_entries')
+    created_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = 'content_timeline'
+        ordering = ('-created_at',)
+        unique_together = ('user', 'content')
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-content']),
+        ]
+        verbose_name = 'timeline entry'
+        verbose_name_plural = 'timeline entries'
+
+    def __str__(self):
+        return f'{self.content} in {self.user} timeline'
+
+
+class DiscoverCandidate(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='discover_candidates')
+    content = models.ForeignKey(Content, on_delete=models.CASCADE, related_name='discover_candidates')
+    score = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'content_discover_candidates'
+        ordering = ('-score',)
+        unique_together = ('user', 'content')
+        indexes = [
+            models.Index(fields=['user', '-score']),
+        ]
+        verbose_name = 'discover candidate'
+        verbose_name_plural = 'discover candidates'
+
+    def __str__(self):
+        return f'{self.content} for {self.user}'
+
+
+class ContentRecommendation(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='content_recommendations')
+    content = models.ForeignKey(Content, on_delete=models.CASCADE, related_name='recommendations')
+    score = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'content_recommendations'
+        ordering = ('-score',)
+        unique_together = ('user', 'content')
+        indexes = [
+            models.Index(fields=['user', '-score']),
+        ]
+        verbose_name = 'content recommendation'
+        verbose_name_plural = 'content recommendations'
+
+    def __str__(self):
+        return f'{self.content} for {self.user}'
+
+
+class SeenContentFilter(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='seen_content_filter')
+    current = models.BinaryField()
+    previous = models.BinaryField(null=True)
+    current_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'content_seen_filters'
+        verbose_name = 'seen content filter'
+        verbose_name_plural = 'seen content filters'
+
+    def __str__(self):
+        return f'{self.user} seen contents'
+
+
+class TrendingTag(models.Model):
+    tag = models.OneToOneField(Tag, on_delete=models.CASCADE, related_name='trending')
+    score = models.FloatField()
+    rank = models.PositiveIntegerField(db_index=True)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'content_trending_tags'
+        ordering = ('rank',)
+        verbose_name = 'trending tag'
+        verbose_name_plural = 'trending tags'
+
+    def __str__(self):
+        return f'#{self.rank} {self.tag}'
+
+
+class TrendingContent(models.Model):
+    content = models.OneToOneField(Content, on_delete=models.CASCADE, related_name='trending')
+    score = models.FloatField()
+    rank = models.PositiveIntegerField(db_index=True)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'content_trending_contents'
+        ordering = ('rank',)
+        verbose_name = 'trending content'
+        verbose_name_plural = 'trending contents'
+
+    def __str__(self):
+        return f'#{self.rank} {self.content}'
+
+
+class RelatedContent(models.Model):
+    content = models.ForeignKey(Content, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(Content, on_delete=models.CASCADE, related_name='related_to')
+    score = models.FloatField()
+
+    class Meta:
+        db_table = 'content_related'
+        ordering = ('-score',)
+        unique_together = ('content', 'related')
+        indexes = [
+            models.Index(fields=['content', '-score']),
+        ]
+        verbose_name = 'related content'
+        verbose_name_plural = 'related contents'
+
+    def __str__(self):
+        return f'{self.related} related to {self.content}'
+
+
+class ContentViewDaily(models.Model):
+    content = models.ForeignKey(Content, on_delete=models.CASCADE, related_name='daily_views')
+    date = models.DateField()
+    views = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'content_views_daily'
+        ordering = ('-date',)
+        unique_together = ('content', 'date')
+        verbose_name = 'content daily views'
+        verbose_name_plural = 'content daily views'
+
+    def __str__(self):
+        return f'{self.content} on {self.date}: {self.views}'
+
+
 class ContentReport(models.Model):
     id = CustomAutoField(primary_key=True, editable=False)
     content = models.ForeignKey(Content, on_delete=models.CASCADE, related_name='reports', db_index=True)
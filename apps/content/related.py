@@ -0,0 +1,98 @@
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+
+from apps.content.models import Content, Like, RelatedContent
+
+TAG_WEIGHT = 0.5
+MAIN_TAG_WEIGHT = 0.2
+CO_LIKE_WEIGHT = 0.3
+
+
+def get_tag_neighbors(content: Content) -> dict[int, float]:
+    """Share of this content's tags that each neighbor created within RELATED_WINDOW before it carries too."""
+    tag_ids = list(content.tags.values_list('id', flat=True))
+    if not tag_ids:
+        return {}
+    links = Content.tags.through.objects.filter(
+        tag_id__in=tag_ids, content__type=Content.ContentType.CONTENT,
+        content__created_at__gte=content.created_at - settings.RELATED_WINDOW
+    )
+    links = links.exclude(content_id=content.id).values('content_id').annotate(shared=Count('id'))
+    links = links.order_by('-shared', '-content_id').values_list('content_id', 'shared')
+    return {content_id: shared / len(tag_ids) for content_id, shared in links[:settings.RELATED_SOURCE_LIMIT]}
+
+
+def get_main_tag_neighbors(content: Content) -> set[int]:
+    if not content.main_tag_id:
+        return set()
+    contents = Content.objects.filter(main_tag_id=content.main_tag_id, type=Content.ContentType.CONTENT)
+    return set(contents.exclude(id=content.id).values_list('id', flat=True)[:settings.RELATED_SOURCE_LIMIT])
+
+
+def get_co_like_neighbors(content: Content) -> dict[int, float]:
+    """Contents liked by the latest likers of this one, relative to the most co-liked neighbor."""
+    likers = Like.objects.filter(content_id=content.id).order_by('-created_at').values('user_id')
+    likes = Like.objects.filter(user_id__in=likers[:settings.RELATED_SOURCE_LIMIT])
+    likes = likes.filter(content__type=Content.ContentType.CONTENT).exclude(content_id=content.id)
+    likes = likes.values('content_id').annotate(likers=Count('id')).order_by('-likers').values_list(
+        'content_id', 'likers'
+    )
+    counts = dict(likes[:settings.RELATED_SOURCE_LIMIT])
+    most = max(counts.values(), default=0)
+    return {content_id: total / most for content_id, total in counts.items()}
+
+
+def score_related(content: Content) -> list[tuple[int, float]]:
+    scores = Counter()
+    for content_id, share in get_tag_neighbors(content).items():
+        scores[content_id] += TAG_WEIGHT * share
+    for content_id in get_main_tag_neighbors(content):
+        scores[content_id] += MAIN_TAG_WEIGHT
+    for content_id, share in get_co_like_neighbors(content).items():
+        scores[content_id] += CO_LIKE_WEIGHT * share
+    return sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)[:settings.RELATED_CONTENT_LIMIT]
+
+
+def refresh_related(content: Content) -> list[tuple[int, float]]:
+    neighbors = score_related(content)
+    with transaction.atomic():
+        RelatedContent.objects.filter(content=content).delete()
+        RelatedContent.objects.bulk_create(
+            [RelatedContent(content=content, related_id=related_id, score=score) for related_id, score in neighbors]
+        )
+    return neighbors
+
+
+def add_related_content(content: Content) -> None:
+    """
+    Builds the list of a new content and offers it to each of its neighbors' lists, treating the scores as
+    symmetric. A neighbor keeps the new content only if it beats its weakest entry once the list is full.
+    """
+    neighbors = refresh_related(content)
+    if not neighbors:
+        return
+    limit = settings.RELATED_CONTENT_LIMIT
+    entries = defaultdict(list)
+    existing = RelatedContent.objects.filter(content_id__in=[related_id for related_id, _ in neighbors])
+    for entry_id, content_id, score in existing.values_list('id', 'content_id', 'score'):
+        entries[content_id].append((score, entry_id))
+
+    created, evicted = [], []
+    for related_id, score in neighbors:
+        current = sorted(entries[related_id], reverse=True)
+        if len(current) >= limit:
+            if score <= current[limit - 1][0]:
+                continue
+            evicted.extend(entry_id for _, entry_id in current[limit - 1:])
+        created.append(RelatedContent(content_id=related_id, related=content, score=score))
+    with transaction.atomic():
+        RelatedContent.objects.filter(id__in=evicted).delete()
+        RelatedContent.objects.bulk_create(created, ignore_conflicts=True)
+
+
+def get_related_queryset(content_id: int):
+    related = Content.objects.filter(related_to__content_id=content_id)
+    return related.annotate(score=F('related_to__score')).order_by('-score', '-id')
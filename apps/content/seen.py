@@ -0,0 +1,82 @@
+import hashlib
+import math
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.accounts.models import User
+from apps.content.feed_cache import feed_cache
+from apps.content.models import DiscoverCandidate, SeenContentFilter
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over content ids, stored as raw bytes."""
+
+    def __init__(self, data: bytes | None = None, size: int | None = None, capacity: int | None = None):
+        self.size = size or settings.SEEN_FILTER_SIZE
+        capacity = capacity or settings.SEEN_FILTER_CAPACITY
+        self.bits = bytearray(data) if data else bytearray(self.size)
+        self.bit_count = len(self.bits) * 8
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+
+    def get_positions(self, item) -> list[int]:
+        digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+        return [(first + index * second) % self.bit_count for index in range(self.hash_count)]
+
+    def add(self, item) -> None:
+        for position in self.get_positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.get_positions(item))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.bits)
+
+
+class SeenContentSet:
+    """
+    Two rotating Bloom filters: once the current one reaches SEEN_FILTER_CAPACITY it becomes the previous one, so
+    the set remembers the last one to two generations of impressions in a constant few kilobytes.
+    """
+
+    def __init__(self, seen_filter: SeenContentFilter):
+        self.seen_filter = seen_filter
+        self.current = BloomFilter(seen_filter.current)
+        self.previous = BloomFilter(seen_filter.previous) if seen_filter.previous else None
+
+    def add(self, content_id: int) -> None:
+        if content_id in self:
+            return
+        if self.seen_filter.current_count >= settings.SEEN_FILTER_CAPACITY:
+            self.previous, self.current = self.current, BloomFilter()
+            self.seen_filter.current_count = 0
+        self.current.add(content_id)
+        self.seen_filter.current_count += 1
+
+    def __contains__(self, content_id: int) -> bool:
+        return content_id in self.current or (self.previous is not None and content_id in self.previous)
+
+    def save(self) -> None:
+        self.seen_filter.current = self.current.to_bytes()
+        self.seen_filter.previous = self.previous.to_bytes() if self.previous else None
+        self.seen_filter.save()
+
+
+def get_seen_contents(user: User) -> SeenContentSet:
+    seen_filter = SeenContentFilter.objects.filter(user=user).first()
+    return SeenContentSet(seen_filter or SeenContentFilter(user=user, current=b''))
+
+
+def record_impressions(user: User, content_ids: list[int]) -> None:
+    with transaction.atomic():
+        seen_filter, _ = SeenContentFilter.objects.select_for_update().get_or_create(
+            user=user, defaults={'current': b''}
+        )
+        seen_contents = SeenContentSet(seen_filter)
+        for content_id in content_ids:
+            seen_contents.add(content_id)
+        seen_contents.save()
+    DiscoverCandidate.objects.filter(user=user, content_id__in=content_ids).delete()
+    feed_cache.bump(user.id)
@@ -1,13 +1,39 @@
 from django.core.exceptions import ValidationError
+from django.db.models.manager import BaseManager
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 
 from apps.accounts.models import User, Follow
 from apps.accounts.serializers import UserListSerializer
-from apps.content.models import Content, Like, SavedContent, Tag, ContentReport
+from apps.content.models import Content, Like, SavedContent, Tag, ContentReport, ContentViewDaily
+from apps.content.related import add_related_content
+from apps.content.tags import add_tags, set_tags, upsert_tags
+from apps.media.blobs import acquire_blob, release_blob, store_blob
+from apps.media.jobs import enqueue_media_jobs, run_in_background
+from apps.media.models import UploadSession
+from apps.media.serializers import ImageVariantsField, WaveformField
+from apps.media.uploads import claim_upload
 from apps.content_plan.models import ContentPlan, Subscription
 from apps.notification.models import Notification
-from config.utils import TimestampField
+from config.utils import DynamicFieldsMixin, TimestampField
+
+# Derived from the uploaded media by its processing jobs, so cleared when the media is replaced.
+DERIVED_MEDIA_FIELDS = {
+    'thumbnail': None, 'stream': None, 'media_variants': {}, 'media_placeholder': None, 'media_waveform': None,
+    'media_width': None, 'media_height': None, 'media_duration': None, 'media_codec': None, 'media_bitrate': None,
+}
+
+
+class MediaVariantsField(ImageVariantsField):
+    """Feed variant URLs of image content, ``None`` for other media types."""
+
+    def __init__(self, **kwargs):
+        super().__init__('media', 'feed', **kwargs)
+
+    def to_representation(self, instance):
+        if instance.media_type != Content.ContentMediaType.IMAGE:
+            return None
+        return super().to_representation(instance)
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -17,22 +43,78 @@ class TagSerializer(serializers.ModelSerializer):
         fields = ('id', 'name')
 
 
+class TrendingTagSerializer(TagSerializer):
+    rank = serializers.IntegerField(source='trending.rank', read_only=True)
+    score = serializers.FloatField(source='trending.score', read_only=True)
+
+    class Meta:
+        model = Tag
+        fields = ('id', 'name', 'rank', 'score')
+
+
 class ContentPlanInfoSerializer(serializers.ModelSerializer):
     is_active = serializers.BooleanField(default=True)
     created_at = TimestampField(read_only=True)
+    banner_variants = ImageVariantsField('banner', 'cover')
 
     class Meta:
         model = ContentPlan
         fields = (
-            'id', 'name', 'banner', 'is_active', 'description', 'created_at'
+            'id', 'name', 'banner', 'banner_variants', 'is_active', 'description', 'created_at'
         )
 
 
-class ContentSerializer(serializers.ModelSerializer):
+class ContentPageSerializer(serializers.ListSerializer):
+    """Resolves the viewer state of a whole page up front, one query per relation."""
+
+    def to_representation(self, data):
+        contents = list(data.all() if isinstance(data, BaseManager) else data)
+        self.context['viewer_state'] = self.get_viewer_state(contents)
+        return [self.child.to_representation(item) for item in contents]
+
+    def get_viewer_state(self, contents) -> dict:
+        content_ids = [content.id for content in contents]
+        request = self.context.get('request')
+        user = request.user if request else None
+        state = {
+            'content_ids': set(content_ids),
+            'liked': set(),
+            'saved': set(),
+            'subscribed': set(),
+            'following': set(),
+        }
+        if not content_ids or not user or not user.is_authenticated:
+            return state
+        fields = self.child.fields
+        plan_ids = {content.content_plan_id for content in contents if content.content_plan_id}
+        author_ids = {content.user_id for content in contents}
+        if 'has_liked' in fields:
+            state['liked'] = set(
+                Like.objects.filter(user=user, content_id__in=content_ids).values_list('content_id', flat=True)
+            )
+        if 'has_saved' in fields:
+            state['saved'] = set(
+                SavedContent.objects.filter(user=user, content_id__in=content_ids).values_list('content_id', flat=True)
+            )
+        if 'is_following' in fields:
+            state['following'] = set(
+                Follow.objects.filter(follower=user, following_id__in=author_ids)
+                .values_list('following_id', flat=True)
+            )
+        if plan_ids and 'has_subscribed' in fields:
+            state['subscribed'] = set(
+                Subscription.objects.filter(user=user, content_plan_id__in=plan_ids)
+                .values_list('content_plan_id', flat=True)
+            )
+        return state
+
+
+class ContentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     main_tag_name = serializers.CharField(write_only=True, required=False)
     tag_list = serializers.ListField(child=serializers.CharField(), write_only=True, required=False)
     tagged_user_list = serializers.ListField(child=serializers.CharField(), write_only=True, required=False)
     content_plan_id = serializers.IntegerField(source='content_plan.id', write_only=True, required=False)
+    upload_id = serializers.UUIDField(write_only=True, required=False)
     main_tag = TagSerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
     user = UserListSerializer(read_only=True)
@@ -44,31 +126,62 @@ class ContentSerializer(serializers.ModelSerializer):
     has_subscribed = serializers.SerializerMethodField(read_only=True)
     is_following = serializers.SerializerMethodField(read_only=True)
     tagged_users = UserListSerializer(many=True, read_only=True)
+    like_count = serializers.IntegerField(read_only=True)
+    comment_count = serializers.IntegerField(read_only=True)
+    view_count = serializers.IntegerField(read_only=True)
+    media_width = serializers.IntegerField(read_only=True)
+    media_height = serializers.IntegerField(read_only=True)
+    media_duration = serializers.FloatField(read_only=True)
+    media_placeholder = serializers.CharField(read_only=True)
+    media_waveform = WaveformField()
+    stream_url = serializers.FileField(source='stream', read_only=True)
+    media_variants = MediaVariantsField()
 
     class Meta:
         model = Content
+        list_serializer_class = ContentPageSerializer
         fields = (
-            'id', 'user', 'text', 'comment_count', 'type', 'like_count', 'has_liked', 'main_tag_name', 'main_tag',
-            'tagged_user_list', 'has_saved', 'created_at', 'updated_at', 'media', 'media_preview', 'media_type',
-            'thumbnail', 'tag_list', 'tags', 'tagged_users', 'content_plan_id', 'media_aspect_ratio', 'banner',
-            'has_subscribed', 'is_following', 'content_plan'
+            'id', 'user', 'text', 'comment_count', 'type', 'like_count', 'view_count', 'has_liked', 'main_tag_name',
+            'main_tag', 'tagged_user_list', 'has_saved', 'created_at', 'updated_at', 'media', 'upload_id',
+            'media_variants', 'media_placeholder', 'media_waveform', 'media_preview', 'media_type', 'media_status',
+            'thumbnail', 'stream_url', 'tag_list', 'tags', 'tagged_users', 'content_plan_id', 'media_aspect_ratio',
+            'media_width', 'media_height', 'media_duration', 'banner', 'has_subscribed', 'is_following', 'content_plan'
         )
+        expandable_fields = ('user', 'main_tag', 'tags', 'tagged_users', 'content_plan')
+        select_related_fields = ('user', 'main_tag', 'content_plan')
+        prefetch_related_fields = ('tags', 'tagged_users')
+
+    def get_page_state(self, obj) -> dict | None:
+        state = self.context.get('viewer_state')
+        return state if state and obj.id in state['content_ids'] else None
 
     def get_has_liked(self, obj) -> bool:
+        state = self.get_page_state(obj)
+        if state:
+            return obj.id in state['liked']
         user = self.context.get('request').user
         return Like.objects.filter(content=obj, user=user).exists()
 
     def get_has_subscribed(self, obj) -> bool:
+        state = self.get_page_state(obj)
+        if state:
+            return obj.content_plan_id in state['subscribed']
         return Subscription.objects.filter(
             content_plan=obj.content_plan,
             user=self.context.get('request').user
         ).exists()
 
     def get_is_following(self, obj) -> bool:
+        state = self.get_page_state(obj)
+        if state:
+            return obj.user_id in state['following']
         user = self.context.get('request').user
         return Follow.objects.filter(follower=user, following=obj.user).exists()
 
     def get_has_saved(self, obj) -> bool:
+        state = self.get_page_state(obj)
+        if state:
+            return obj.id in state['saved']
         user = self.context.get('request').user
         return SavedContent.objects.filter(content=obj, user=user).exists()
 
@@ -77,17 +190,22 @@ class ContentSerializer(serializers.ModelSerializer):
         tags = validated_data.pop('tag_list', [])
         tagged_users = validated_data.pop('tagged_user_list', [])
         content_plan = validated_data.pop('content_plan', None)
+        upload_id = validated_data.pop('upload_id', None)
         if content_plan:
             content_plan = get_object_or_404(ContentPlan, id=content_plan['id'])
             validated_data['content_plan'] = content_plan
-        content = Content.objects.create(**validated_data)
+        if upload_id:
+            validated_data['media'] = claim_upload(upload_id, validated_data['user'], UploadSession.Purpose.CONTENT)
+            if not validated_data['media']:
+                raise serializers.ValidationError({'upload_id': 'Upload is not finalized or was already used.'})
+        elif validated_data.get('media'):
+            validated_data['media'] = store_blob(validated_data['media']).name
         if main_tag_name:
-            main_tag, _ = Tag.objects.get_or_create(name=main_tag_name)
-            content.main_tag = main_tag
-        content.save()
-        for tag_name in tags:
-            tag, _ = Tag.objects.get_or_create(name=tag_name)
-            content.tags.add(tag)
+            validated_data['main_tag_id'] = next(iter(upsert_tags([main_tag_name])), None)
+        content = Content.objects.create(**validated_data)
+        add_tags(content, 'tags', tags)
+        if content.type == Content.ContentType.CONTENT:
+            run_in_background(add_related_content, content)
         for username in tagged_users:
             user = get_object_or_404(User, username=username)
             content.tagged_users.add(user)
@@ -111,23 +229,36 @@ class ContentSerializer(serializers.ModelSerializer):
         tags = validated_data.pop('tag_list', None)
         tagged_users = validated_data.pop('tagged_user_list', None)
         content_plan = validated_data.pop('content_plan', None)
+        upload_id = validated_data.pop('upload_id', None)
+        if upload_id:
+            validated_data['media'] = claim_upload(upload_id, instance.user, UploadSession.Purpose.CONTENT)
+            if not validated_data['media']:
+                raise serializers.ValidationError({'upload_id': 'Upload is not finalized or was already used.'})
+        elif validated_data.get('media'):
+            validated_data['media'] = store_blob(validated_data['media']).name
+        previous_media = instance.media.name if instance.media else None
+        media_replaced = bool(validated_data.get('media')) and validated_data['media'] != previous_media
+        if media_replaced:
+            validated_data.update(DERIVED_MEDIA_FIELDS)
         if content_plan:
             content_plan = get_object_or_404(ContentPlan, id=content_plan['id'])
             instance.content_plan = content_plan
         if main_tag_name:
-            main_tag, = Tag.objects.get_or_create(name=main_tag_name)
-            instance.main_tag = main_tag
+            instance.main_tag_id = next(iter(upsert_tags([main_tag_name])), instance.main_tag_id)
         if tags:
-            instance.tags.clear()
-            for tag_name in tags:
-                tag, _ = Tag.objects.get_or_create(name=tag_name)
-                instance.tags.add(tag)
+            set_tags(instance, 'tags', tags)
         if tagged_users:
             instance.tagged_users.clear()
             for username in tagged_users:
                 user = get_object_or_404(User, username=username)
                 instance.tagged_users.add(user)
-        return super().update(instance, validated_data)
+        instance = super().update(instance, validated_data)
+        if media_replaced:
+            acquire_blob(instance.media.name)
+            if previous_media:
+                release_blob(previous_media)
+            enqueue_media_jobs(instance)
+        return instance
 
     @staticmethod
     def validate_media(value):
@@ -139,35 +270,77 @@ class ContentSerializer(serializers.ModelSerializer):
 
 class ContentListSerializer(ContentSerializer):
 
-    class Meta:
-
-        model = Content
+    class Meta(ContentSerializer.Meta):
         fields = (
-            'id', 'user', 'text', 'comment_count', 'type', 'like_count', 'has_liked', 'main_tag_name', 'main_tag',
-            'tagged_user_list', 'has_saved', 'created_at', 'updated_at', 'media', 'media_preview', 'media_type',
-            'thumbnail', 'tag_list', 'tags', 'tagged_users', 'media_aspect_ratio', 'banner', 'has_subscribed',
-            'is_following',
+            'id', 'user', 'text', 'comment_count', 'type', 'like_count', 'view_count', 'has_liked', 'main_tag_name',
+            'main_tag', 'tagged_user_list', 'has_saved', 'created_at', 'updated_at', 'media', 'media_variants',
+            'media_placeholder', 'media_waveform', 'media_preview', 'media_type', 'media_status', 'thumbnail',
+            'stream_url', 'tag_list', 'tags', 'tagged_users', 'media_aspect_ratio', 'media_width', 'media_height',
+            'media_duration', 'banner', 'has_subscribed', 'is_following',
         )
 
 
 class PaginatedContentSerializer(serializers.Serializer):
-    count = serializers.IntegerField(help_text="Total number of items")
     next = serializers.CharField(allow_null=True, help_text="URL of the next page", required=False)
     previous = serializers.CharField(allow_null=True, help_text="URL of the previous page", required=False)
     results = ContentListSerializer(many=True, read_only=True)
 
 
-class ContentWithoutUserSerializer(ContentSerializer):
+class ContentViewDailySerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = ContentViewDaily
+        fields = ('date', 'views')
+
+
+class ContentViewStatsQuerySerializer(serializers.Serializer):
+    days = serializers.IntegerField(min_value=1, max_value=365, default=30)
+
+
+class ContentViewStatsSerializer(serializers.Serializer):
+    view_count = serializers.IntegerField()
+    daily = ContentViewDailySerializer(many=True)
+
+
+class FeedSinceQuerySerializer(serializers.Serializer):
+    created_at = serializers.IntegerField(help_text='Timestamp of the newest content the client has')
+    id = serializers.IntegerField(help_text='ID of the newest content the client has')
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class FeedSinceSerializer(serializers.Serializer):
+    has_gap = serializers.BooleanField(help_text="More new items exist than were returned")
+    results = ContentListSerializer(many=True, read_only=True)
+
+
+class ContentGridSerializer(serializers.ModelSerializer):
     created_at = TimestampField(read_only=True)
-    updated_at = TimestampField(read_only=True)
+    media_variants = MediaVariantsField()
 
     class Meta:
         model = Content
         fields = (
-            'id', 'text', 'media', 'tags', 'like_count',
-            'comment_count', 'created_at', 'updated_at'
+            'id', 'media_type', 'media_status', 'media_variants', 'media_placeholder', 'media_preview', 'thumbnail',
+            'media_aspect_ratio', 'media_width', 'media_height', 'media_duration', 'like_count', 'comment_count',
+            'view_count', 'created_at'
         )
-            
+
+
+class PaginatedContentGridSerializer(serializers.Serializer):
+    next = serializers.CharField(allow_null=True, help_text="URL of the next page", required=False)
+    previous = serializers.CharField(allow_null=True, help_text="URL of the previous page", required=False)
+    results = ContentGridSerializer(many=True, read_only=True)
+
+
+class ImpressionSerializer(serializers.Serializer):
+    content_ids = serializers.ListField(child=serializers.IntegerField(), max_length=100, allow_empty=False)
+
+
+class FeedCacheStatsSerializer(serializers.Serializer):
+    hits = serializers.IntegerField()
+    misses = serializers.IntegerField()
+    hit_rate = serializers.FloatField()
+
 
 class SavedContentSerializer(serializers.ModelSerializer):
 
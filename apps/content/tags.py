@@ -0,0 +1,98 @@
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+
+from apps.content.models import Tag
+
+INSERT_ATTEMPTS = 3
+
+_tag_ids = OrderedDict()
+_tag_ids_lock = Lock()
+
+
+def normalize_tag_names(names) -> list[str]:
+    """Strips whitespace and leading '#', collapses inner whitespace and drops empty or repeated names."""
+    normalized = []
+    for name in names:
+        name = ' '.join(str(name).strip().lstrip('#').split())[:Tag._meta.get_field('name').max_length]
+        if name and name not in normalized:
+            normalized.append(name)
+    return normalized
+
+
+def get_cached_tag_ids(names) -> dict[str, int]:
+    with _tag_ids_lock:
+        cached = {}
+        for name in names:
+            if name in _tag_ids:
+                _tag_ids.move_to_end(name)
+                cached[name] = _tag_ids[name]
+        return cached
+
+
+def cache_tag_ids(tag_ids: dict[str, int]) -> None:
+    with _tag_ids_lock:
+        _tag_ids.update(tag_ids)
+        while len(_tag_ids) > settings.TAG_ID_CACHE_SIZE:
+            _tag_ids.popitem(last=False)
+
+
+def evict_tag_ids(names) -> None:
+    with _tag_ids_lock:
+        for name in names:
+            _tag_ids.pop(name, None)
+
+
+def upsert_tags(names) -> list[int]:
+    """
+    Returns tag ids for the normalized names, inserting the missing ones with a single INSERT ... ON CONFLICT DO
+    NOTHING. Tag ids are assigned here because CustomAutoField numbers rows one save() at a time.
+    """
+    names = normalize_tag_names(names)
+    tag_ids = get_cached_tag_ids(names)
+    missing = [name for name in names if name not in tag_ids]
+    if missing:
+        tag_ids.update(Tag.objects.filter(name__in=missing).values_list('name', 'id'))
+    for _ in range(INSERT_ATTEMPTS):
+        missing = [name for name in names if name not in tag_ids]
+        if not missing:
+            break
+        next_id = max((Tag.objects.aggregate(last_id=Max('id'))['last_id'] or 0) + 1, Tag.start_id)
+        Tag.objects.bulk_create(
+            [Tag(id=next_id + index, name=name) for index, name in enumerate(missing)],
+            ignore_conflicts=True
+        )
+        tag_ids.update(Tag.objects.filter(name__in=missing).values_list('name', 'id'))
+    # Ids are only cached once they are committed, so a rolled back insert can never be served from the cache.
+    transaction.on_commit(lambda: cache_tag_ids(tag_ids))
+    return [tag_ids[name] for name in names if name in tag_ids]
+
+
+def add_tags(instance, field_name: str, names) -> list[int]:
+    """Attaches the tags to ``instance.<field_name>`` with one bulk insert into the through table."""
+    manager = getattr(instance, field_name)
+    through = manager.through
+    for attempt in range(2):
+        tag_ids = upsert_tags(names)
+        links = [
+            through(**{f'{manager.source_field_name}_id': instance.pk, f'{manager.target_field_name}_id': tag_id})
+            for tag_id in tag_ids
+        ]
+        try:
+            with transaction.atomic():
+                through.objects.bulk_create(links, ignore_conflicts=True)
+            return tag_ids
+        except IntegrityError:
+            # A cached id may belong to a tag deleted by another process.
+            if attempt:
+                raise
+            evict_tag_ids(normalize_tag_names(names))
+
+
+def set_tags(instance, field_name: str, names) -> list[int]:
+    manager = getattr(instance, field_name)
+    manager.through.objects.filter(**{f'{manager.source_field_name}_id': instance.pk}).delete()
+    return add_tags(instance, field_name, names)
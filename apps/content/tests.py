@@ -1,3 +1,338 @@
-from django.test import TestCase
+import time
+from datetime import timedelta
+from collections import Counter
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import Follow
+from apps.content.affinity import compute_recommendations
+from apps.content.discover import refresh_candidates
+from apps.content.feed_cache import feed_cache
+from apps.content.models import Content, ContentRecommendation, Like, RelatedContent, Tag, TimelineEntry
+from apps.content.related import add_related_content
+from apps.content.seen import get_seen_contents
+from apps.content.tags import add_tags, set_tags, upsert_tags
+from apps.content.timeline import LARGE_ACCOUNTS_CACHE_KEY
+from apps.content.trending import refresh_trending
+from apps.content.view_counts import ViewCounter, view_counter
+
+User = get_user_model()
+
+
+@override_settings(MEDIA_JOBS_EAGER=True)
+class ContentTests(APITestCase):
+
+    def setUp(self):
+        feed_cache.cache.clear()
+        view_counter.pending.clear()
+        self.enterContext(mock.patch.object(view_counter, 'start'))
+        self.grow_url = reverse('grow-contents')
+        self.discover_url = reverse('discover-contents')
+        self.user = User.objects.create_user(username='viewer', email='viewer@example.com', password='password!123')
+        self.author = User.objects.create_user(username='author', email='author@example.com', password='password!123')
+        self.client.force_authenticate(user=self.user)
+
+    def create_content(self, user, text='Post'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Content.objects.create(user=user, text=text, type=Content.ContentType.CONTENT)
+
+    def test_new_content_is_fanned_out_to_followers(self):
+        Follow.objects.create(follower=self.user, following=self.author)
+        with self.captureOnCommitCallbacks() as callbacks:
+            content = Content.objects.create(user=self.author, text='Post', type=Content.ContentType.CONTENT)
+        self.assertFalse(TimelineEntry.objects.filter(user=self.user).exists())
+        for callback in callbacks:
+            callback()
+        self.assertTrue(TimelineEntry.objects.filter(user=self.user, content=content).exists())
+        response = self.client.get(self.grow_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['results']], [content.id])
+
+    def test_follow_backfills_and_unfollow_trims_timeline(self):
+        content = self.create_content(self.author)
+        follow = Follow.objects.create(follower=self.user, following=self.author)
+        self.assertTrue(TimelineEntry.objects.filter(user=self.user, content=content).exists())
+        follow.delete()
+        self.assertFalse(TimelineEntry.objects.filter(user=self.user).exists())
+
+    def test_grow_cursor_pagination(self):
+        Follow.objects.create(follower=self.user, following=self.author)
+        contents = [self.create_content(self.author, text=f'Post {index}') for index in range(5)]
+        expected_ids = [content.id for content in reversed(contents)]
+        response = self.client.get(self.grow_url, {'page_size': 2})
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['previous'])
+        seen_ids = [item['id'] for item in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            seen_ids += [item['id'] for item in response.data['results']]
+        self.assertEqual(seen_ids, expected_ids)
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([item['id'] for item in response.data['results']], expected_ids[2:4])
+
+    def test_grow_merges_large_account_contents_into_pages(self):
+        celebrity = User.objects.create_user(username='celebrity', email='star@example.com', password='password!123')
+        Follow.objects.create(follower=self.user, following=self.author)
+        Follow.objects.create(follower=self.user, following=celebrity)
+        Follow.objects.create(follower=self.author, following=celebrity)
+        with override_settings(TIMELINE_FANOUT_LIMIT=1):
+            cache.delete(LARGE_ACCOUNTS_CACHE_KEY)
+            contents = [self.create_content(user, 'Post') for user in (self.author, celebrity) * 2]
+            expected_ids = [content.id for content in reversed(contents)]
+            self.assertEqual(TimelineEntry.objects.filter(user=self.user).count(), 2)
+            response = self.client.get(self.grow_url, {'page_size': 3})
+            seen_ids = [item['id'] for item in response.data['results']]
+            response = self.client.get(response.data['next'])
+            seen_ids += [item['id'] for item in response.data['results']]
+            self.assertEqual(seen_ids, expected_ids)
+            self.assertIsNone(response.data['next'])
+            response = self.client.get(response.data['previous'])
+            self.assertEqual([item['id'] for item in response.data['results']], expected_ids[:3])
+            latest = self.create_content(celebrity, 'Latest')
+            response = self.client.get(self.grow_url, {'page_size': 3})
+            self.assertEqual(response.data['results'][0]['id'], latest.id)
+        cache.delete(LARGE_ACCOUNTS_CACHE_KEY)
+
+    def test_grow_query_count_does_not_depend_on_page_size(self):
+        Follow.objects.create(follower=self.user, following=self.author)
+        for index in range(6):
+            content = self.create_content(self.author, text=f'Post {index}')
+            Like.objects.create(user=self.user, content=content)
+        query_counts = []
+        for page_size in (2, 6):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(self.grow_url, {'page_size': page_size})
+            self.assertTrue(all(item['has_liked'] for item in response.data['results']))
+            query_counts.append(len(context.captured_queries))
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    def test_like_counter_changes_only_when_row_changes(self):
+        content = self.create_content(self.author)
+        like_url = reverse('content-like', kwargs={'content_id': content.id})
+        self.client.post(like_url)
+        self.client.post(like_url)
+        content.refresh_from_db()
+        self.assertEqual(content.like_count, 1)
+        self.client.delete(like_url)
+        self.client.delete(like_url)
+        content.refresh_from_db()
+        self.assertEqual(content.like_count, 0)
+
+    def test_reconcile_content_counters(self):
+        content = self.create_content(self.author)
+        Like.objects.create(user=self.user, content=content)
+        Content.objects.filter(id=content.id).update(comment_count=7)
+        call_command('reconcile_content_counters', batch_size=1, stdout=StringIO())
+        content.refresh_from_db()
+        self.assertEqual((content.like_count, content.comment_count), (1, 0))
+
+    def test_discover_ranks_candidates_by_interest(self):
+        music = Tag.objects.create(name='music')
+        self.user.interests.add(music)
+        tagged = self.create_content(self.author, text='Tagged')
+        tagged.tags.add(music)
+        untagged = self.create_content(self.author, text='Untagged')
+        refresh_candidates(self.user)
+        response = self.client.get(self.discover_url, {'page_size': 1})
+        self.assertEqual([item['id'] for item in response.data['results']], [tagged.id])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([item['id'] for item in response.data['results']], [untagged.id])
+        self.assertIsNone(response.data['next'])
+
+    def test_trending_rankings(self):
+        travel = Tag.objects.create(name='travel')
+        popular = self.create_content(self.author, text='Popular')
+        popular.tags.add(travel)
+        quiet = self.create_content(self.author, text='Quiet')
+        Like.objects.create(user=self.user, content=popular)
+        Like.objects.create(user=self.author, content=popular)
+        Like.objects.create(user=self.user, content=quiet)
+        refresh_trending()
+        response = self.client.get(reverse('tag-trending'))
+        self.assertEqual([item['name'] for item in response.data], ['travel'])
+        response = self.client.get(reverse('content-trending'))
+        self.assertEqual([item['id'] for item in response.data['results']], [popular.id, quiet.id])
+
+    def test_grow_pages_are_cached_until_invalidated(self):
+        Follow.objects.create(follower=self.user, following=self.author)
+        content = self.create_content(self.author)
+        self.client.get(self.grow_url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.grow_url)
+        self.assertFalse(response.data['results'][0]['has_liked'])
+        self.client.post(reverse('content-like', kwargs={'content_id': content.id}))
+        response = self.client.get(self.grow_url)
+        self.assertTrue(response.data['results'][0]['has_liked'])
+
+    def test_impressions_suppress_seen_discover_candidates(self):
+        seen = self.create_content(self.author, text='Seen')
+        fresh = self.create_content(self.author, text='Fresh')
+        refresh_candidates(self.user)
+        response = self.client.post(reverse('content-impressions'), {'content_ids': [seen.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertIn(seen.id, get_seen_contents(self.user))
+        self.assertNotIn(fresh.id, get_seen_contents(self.user))
+        refresh_candidates(self.user)
+        response = self.client.get(self.discover_url)
+        self.assertEqual([item['id'] for item in response.data['results']], [fresh.id])
+
+    def test_impressions_invalidate_the_cached_discover_page(self):
+        seen = self.create_content(self.author, text='Seen')
+        fresh = self.create_content(self.author, text='Fresh')
+        refresh_candidates(self.user)
+        response = self.client.get(self.discover_url)
+        self.assertEqual({item['id'] for item in response.data['results']}, {seen.id, fresh.id})
+        self.client.post(reverse('content-impressions'), {'content_ids': [seen.id]}, format='json')
+        response = self.client.get(self.discover_url)
+        self.assertEqual([item['id'] for item in response.data['results']], [fresh.id])
+
+    def test_grow_since_returns_only_newer_contents(self):
+        Follow.objects.create(follower=self.user, following=self.author)
+        oldest, middle, newest = [self.create_content(self.author, text=f'Post {index}') for index in range(3)]
+        since = {'created_at': int(oldest.created_at.timestamp()), 'id': oldest.id}
+        response = self.client.get(reverse('grow-since'), {**since, 'limit': 1})
+        self.assertTrue(response.data['has_gap'])
+        self.assertEqual([item['id'] for item in response.data['results']], [newest.id])
+        response = self.client.get(reverse('grow-since'), since)
+        self.assertFalse(response.data['has_gap'])
+        self.assertEqual([item['id'] for item in response.data['results']], [newest.id, middle.id])
+
+    def test_sparse_fields_prune_output_and_queries(self):
+        Follow.objects.create(follower=self.user, following=self.author)
+        self.create_content(self.author)
+        with CaptureQueriesContext(connection) as full_context:
+            self.client.get(self.grow_url, {'page_size': 5})
+        feed_cache.cache.clear()
+        with CaptureQueriesContext(connection) as grid_context:
+            response = self.client.get(self.grow_url, {'fields': 'id,thumbnail,media_aspect_ratio'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'thumbnail', 'media_aspect_ratio'})
+        self.assertLess(len(grid_context.captured_queries), len(full_context.captured_queries))
+        response = self.client.get(self.grow_url, {'fields': 'id,user'})
+        self.assertEqual(response.data['results'][0]['user'], self.author.id)
+        response = self.client.get(self.grow_url, {'fields': 'id,user', 'expand': 'user'})
+        self.assertEqual(response.data['results'][0]['user']['username'], self.author.username)
+
+    def test_tag_upsert_is_set_based(self):
+        existing = Tag.objects.create(name='django')
+        names = [f'tag{index}' for index in range(20)]
+        content = self.create_content(self.author)
+        with CaptureQueriesContext(connection) as context:
+            add_tags(content, 'tags', ['#django', ' django ', *names])
+        self.assertLessEqual(len(context.captured_queries), 8)
+        self.assertEqual(content.tags.count(), 21)
+        self.assertIn(existing, content.tags.all())
+        self.assertEqual(upsert_tags(['django']), [existing.id])
+        set_tags(content, 'tags', ['django'])
+        self.assertEqual(list(content.tags.all()), [existing])
+
+    def test_views_are_buffered_and_flushed_in_batches(self):
+        first, second = self.create_content(self.user), self.create_content(self.user, 'Second')
+        self.client.post(reverse('content-impressions'), {'content_ids': [first.id, second.id]}, format='json')
+        self.client.get(reverse('content-detail', args=[first.id]))
+        first.refresh_from_db()
+        self.assertEqual(first.view_count, 0)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(view_counter.flush(), 3)
+        self.assertLessEqual(len(context.captured_queries), 6)
+        view_counter.record([first.id])
+        view_counter.flush()
+        response = self.client.get(reverse('content-views', args=[first.id]))
+        self.assertEqual(response.data['view_count'], 3)
+        self.assertEqual([day['views'] for day in response.data['daily']], [3])
+        self.client.force_authenticate(user=self.author)
+        response = self.client.get(reverse('content-views', args=[first.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_view_counter_flushes_in_the_background_and_keeps_views_on_errors(self):
+        counter = ViewCounter()
+        with (
+            override_settings(VIEW_COUNT_FLUSH_INTERVAL=0.01),
+            mock.patch.object(counter, 'write', side_effect=[DatabaseError('down'), None]) as write,
+            self.assertLogs('apps.content.view_counts', 'ERROR')
+        ):
+            counter.record([1, 1, 2])
+            for _ in range(200):
+                if write.call_count == 2:
+                    break
+                time.sleep(0.01)
+        self.assertEqual(write.call_args_list[1].args[0], Counter({1: 2, 2: 1}))
+        self.assertEqual(counter.pending, Counter())
+
+    def test_profile_grid_is_paginated_and_lightweight(self):
+        contents = [self.create_content(self.author, f'Post {index}') for index in range(5)]
+        Content.objects.filter(id=contents[-1].id).update(thumbnail='contents/post.mp4_thumbnail.jpg')
+        url = reverse('user-contents', args=[self.author.username])
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {'page_size': 3})
+        self.assertEqual(len(context.captured_queries), 2)
+        self.assertNotIn('text', response.data['results'][0])
+        thumbnail_url = 'http://testserver/media/contents/post.mp4_thumbnail.jpg'
+        self.assertEqual(response.data['results'][0]['thumbnail'], thumbnail_url)
+        self.assertEqual([item['id'] for item in response.data['results']], [c.id for c in contents[:1:-1]])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([item['id'] for item in response.data['results']], [c.id for c in contents[1::-1]])
+        self.assertIsNone(response.data['next'])
+
+    def test_saved_contents_are_ordered_by_save_time(self):
+        older, newer = self.create_content(self.author, 'Older'), self.create_content(self.author, 'Newer')
+        for content in (newer, older):
+            self.client.post(reverse('content-save', args=[content.id]))
+        response = self.client.get(reverse('content-saved'), {'page_size': 1})
+        self.assertEqual([item['id'] for item in response.data['results']], [older.id])
+        self.assertTrue(response.data['results'][0]['has_saved'])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([item['id'] for item in response.data['results']], [newer.id])
+        self.assertIsNone(response.data['next'])
+
+    def test_related_contents_are_indexed_incrementally(self):
+        cooking = self.create_content(self.author, 'Cooking')
+        add_tags(cooking, 'tags', ['food', 'recipes'])
+        travel = self.create_content(self.author, 'Travel')
+        add_tags(travel, 'tags', ['travel'])
+        Like.objects.create(user=self.user, content=travel)
+        baking = self.create_content(self.author, 'Baking')
+        add_tags(baking, 'tags', ['food', 'recipes', 'cake'])
+        Like.objects.create(user=self.user, content=baking)
+        archived = self.create_content(self.author, 'Archived')
+        add_tags(archived, 'tags', ['food', 'recipes', 'cake'])
+        Content.objects.filter(id=archived.id).update(created_at=baking.created_at - timedelta(days=365))
+        add_related_content(baking)
+        self.assertEqual(
+            list(RelatedContent.objects.filter(content=baking).values_list('related_id', flat=True)),
+            [cooking.id, travel.id]
+        )
+        self.assertTrue(RelatedContent.objects.filter(content=cooking, related=baking).exists())
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('content-related', args=[baking.id]), {'fields': 'id'})
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual([item['id'] for item in response.data], [cooking.id, travel.id])
+
+    def test_recommendations_follow_tag_affinity(self):
+        add_tags(self.user, 'interests', ['music'])
+        liked = self.create_content(self.author, 'Liked')
+        add_tags(liked, 'tags', ['jazz'])
+        Like.objects.create(user=self.user, content=liked)
+        jazz = self.create_content(self.author, 'Jazz')
+        add_tags(jazz, 'tags', ['jazz'])
+        music = self.create_content(self.author, 'Music')
+        add_tags(music, 'tags', ['music', 'jazz'])
+        sports = self.create_content(self.author, 'Sports')
+        add_tags(sports, 'tags', ['sports'])
+        own = self.create_content(self.user, 'Own')
+        add_tags(own, 'tags', ['music'])
+        compute_recommendations(User.objects.filter(id=self.user.id))
+        recommended = list(ContentRecommendation.objects.filter(user=self.user).values_list('content_id', flat=True))
+        self.assertEqual(recommended, [music.id, jazz.id])
+        refresh_candidates(self.user)
+        response = self.client.get(self.discover_url)
+        self.assertEqual([item['id'] for item in response.data['results']][:2], [music.id, jazz.id])
@@ -0,0 +1,152 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.accounts.models import Follow, User
+from apps.content.feed_cache import feed_cache
+from apps.content.models import Content, TimelineEntry
+from apps.media.jobs import run_in_background
+from config.pagination import KeysetPagination
+
+LARGE_ACCOUNTS_CACHE_KEY = 'timeline:large-accounts'
+LARGE_ACCOUNTS_CACHE_TIMEOUT = 10 * 60
+
+
+def get_large_account_ids() -> set[int]:
+    """Accounts with more followers than TIMELINE_FANOUT_LIMIT are merged into timelines at read time."""
+    account_ids = cache.get(LARGE_ACCOUNTS_CACHE_KEY)
+    if account_ids is None:
+        account_ids = set(
+            Follow.objects.values('following')
+            .annotate(follower_total=Count('id'))
+            .filter(follower_total__gt=settings.TIMELINE_FANOUT_LIMIT)
+            .values_list('following', flat=True)
+        )
+        cache.set(LARGE_ACCOUNTS_CACHE_KEY, account_ids, LARGE_ACCOUNTS_CACHE_TIMEOUT)
+    return account_ids
+
+
+def bump_follower_feeds(user_id: int) -> None:
+    """Invalidates the cached feeds of a large account's followers, whose timelines merge its contents at read time."""
+    follower_ids = Follow.objects.filter(following_id=user_id).values_list('follower_id', flat=True)
+    batch = []
+    for follower_id in follower_ids.iterator(chunk_size=settings.TIMELINE_BATCH_SIZE):
+        batch.append(follower_id)
+        if len(batch) == settings.TIMELINE_BATCH_SIZE:
+            feed_cache.bump(*batch)
+            batch = []
+    if batch:
+        feed_cache.bump(*batch)
+
+
+def fan_out_content(content: Content) -> None:
+    """Copies new content into its author's followers' timelines; runs on the worker pool after the post commits."""
+    if content.user_id in get_large_account_ids():
+        bump_follower_feeds(content.user_id)
+        return
+    follower_ids = list(Follow.objects.filter(following_id=content.user_id).values_list('follower_id', flat=True))
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=follower_id, content_id=content.id, created_at=content.created_at)
+            for follower_id in follower_ids
+        ],
+        batch_size=settings.TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+    feed_cache.bump(*follower_ids)
+
+
+def backfill_timeline(follower_id: int, following_id: int) -> None:
+    if following_id in get_large_account_ids():
+        return
+    contents = Content.objects.filter(user_id=following_id, type=Content.ContentType.CONTENT)
+    contents = contents.values_list('id', 'created_at')[:settings.TIMELINE_BACKFILL_SIZE]
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=follower_id, content_id=content_id, created_at=created_at)
+            for content_id, created_at in contents
+        ],
+        batch_size=settings.TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+    cap_timeline(follower_id)
+
+
+def trim_timeline(follower_id: int, following_id: int) -> None:
+    TimelineEntry.objects.filter(user_id=follower_id, content__user_id=following_id).delete()
+
+
+def cap_timeline(user_id: int) -> None:
+    entries = TimelineEntry.objects.filter(user_id=user_id).values_list('created_at', flat=True)
+    oldest_kept = entries[settings.TIMELINE_MAX_LENGTH - 1:settings.TIMELINE_MAX_LENGTH].first()
+    if oldest_kept:
+        TimelineEntry.objects.filter(user_id=user_id, created_at__lt=oldest_kept).delete()
+
+
+def get_followed_large_accounts(user: User) -> list[int]:
+    large_account_ids = get_large_account_ids()
+    if not large_account_ids:
+        return []
+    return list(
+        Follow.objects.filter(follower=user, following_id__in=large_account_ids).values_list('following_id', flat=True)
+    )
+
+
+def get_range(queryset, ordering: tuple, position, reverse: bool, limit: int) -> list[tuple]:
+    """The first ``limit`` ``ordering`` values past a keyset ``position``, read as one index range."""
+    pagination = KeysetPagination(ordering=ordering)
+    if position is not None:
+        queryset = queryset.filter(pagination.get_position_filter(position, reverse))
+    if reverse:
+        ordering = tuple(pagination.invert(field) for field in ordering)
+    return list(queryset.order_by(*ordering).values_list(*(field.lstrip('-') for field in ordering))[:limit])
+
+
+def get_timeline_queryset(
+    user: User, position=None, reverse: bool = False, limit: int | None = None, since: datetime | None = None
+):
+    """
+    Timeline contents past a ``(created_at, id)`` keyset ``position``, read in the direction ``reverse`` has for
+    ``KeysetPagination`` and created no earlier than ``since``.
+
+    Fanned-out entries are read from the ``(user, -created_at, -content_id)`` index and followed large accounts'
+    contents from the ``(type, -created_at, -id)`` one, each bounded by ``limit``; the first ``limit`` of the merged
+    rows are returned as a primary key lookup.
+    """
+    limit = limit or settings.TIMELINE_MAX_LENGTH
+    entries = TimelineEntry.objects.filter(user=user)
+    if since is not None:
+        entries = entries.filter(created_at__gte=since)
+    rows = get_range(entries, ('-created_at', '-content_id'), position, reverse, limit)
+    followed_large_accounts = get_followed_large_accounts(user)
+    if followed_large_accounts:
+        contents = Content.objects.filter(type=Content.ContentType.CONTENT, user_id__in=followed_large_accounts)
+        if since is not None:
+            contents = contents.filter(created_at__gte=since)
+        rows += get_range(contents, ('-created_at', '-id'), position, reverse, limit)
+        rows.sort(reverse=not reverse)
+    content_ids = list(dict.fromkeys(content_id for _, content_id in rows))[:limit]
+    return Content.objects.filter(id__in=content_ids, type=Content.ContentType.CONTENT)
+
+
+@receiver(post_save, sender=Content)
+def content_fan_out(sender, instance, created, **kwargs):
+    if created and instance.type == Content.ContentType.CONTENT:
+        run_in_background(fan_out_content, instance)
+
+
+@receiver(post_save, sender=Follow)
+def follow_backfill_timeline(sender, instance, created, **kwargs):
+    if created:
+        backfill_timeline(instance.follower_id, instance.following_id)
+        feed_cache.bump(instance.follower_id)
+
+
+@receiver(post_delete, sender=Follow)
+def unfollow_trim_timeline(sender, instance, **kwargs):
+    trim_timeline(instance.follower_id, instance.following_id)
+    feed_cache.bump(instance.follower_id)
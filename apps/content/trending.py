@@ -0,0 +1,75 @@
+import math
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from apps.comments.models import Comment
+from apps.content.models import Content, Like, TrendingContent, TrendingTag
+
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+POST_WEIGHT = 3.0
+
+
+def decay(bucket, now) -> float:
+    age = (now - bucket).total_seconds()
+    return math.exp(-math.log(2) * age / settings.TRENDING_HALF_LIFE.total_seconds())
+
+
+def get_bucketed_activity(queryset, since):
+    """Hourly ``(content_id, bucket, total)`` counts of a timestamped queryset inside the window."""
+    queryset = queryset.filter(created_at__gte=since).annotate(bucket=TruncHour('created_at'))
+    return queryset.values('content_id', 'bucket').annotate(total=Count('id')).values_list(
+        'content_id', 'bucket', 'total'
+    ).order_by()
+
+
+def compute_trending() -> tuple[list[tuple[int, float]], list[tuple[int, float]]]:
+    now = timezone.now()
+    since = now - settings.TRENDING_WINDOW
+    content_scores = Counter()
+    for weight, queryset in ((LIKE_WEIGHT, Like.objects.all()), (COMMENT_WEIGHT, Comment.objects.all())):
+        for content_id, bucket, total in get_bucketed_activity(queryset, since):
+            content_scores[content_id] += weight * total * decay(bucket, now)
+
+    posted = Content.objects.filter(type=Content.ContentType.CONTENT, created_at__gte=since)
+    posted = dict(posted.annotate(bucket=TruncHour('created_at')).values_list('id', 'bucket'))
+    content_tags = defaultdict(list)
+    tag_links = Content.tags.through.objects.filter(content_id__in=set(content_scores) | set(posted))
+    for content_id, tag_id in tag_links.values_list('content_id', 'tag_id'):
+        content_tags[content_id].append(tag_id)
+
+    tag_scores = Counter()
+    for content_id, tag_ids in content_tags.items():
+        score = content_scores.get(content_id, 0)
+        if content_id in posted:
+            score += POST_WEIGHT * decay(posted[content_id], now)
+        for tag_id in tag_ids:
+            tag_scores[tag_id] += score
+
+    public_ids = set(
+        Content.objects.filter(id__in=content_scores, type=Content.ContentType.CONTENT).values_list('id', flat=True)
+    )
+    content_ranking = [(content_id, score) for content_id, score in content_scores.most_common()
+                       if content_id in public_ids][:settings.TRENDING_LIMIT]
+    return tag_scores.most_common(settings.TRENDING_LIMIT), content_ranking
+
+
+def refresh_trending() -> None:
+    tag_ranking, content_ranking = compute_trending()
+    now = timezone.now()
+    with transaction.atomic():
+        TrendingTag.objects.all().delete()
+        TrendingContent.objects.all().delete()
+        TrendingTag.objects.bulk_create([
+            TrendingTag(tag_id=tag_id, score=score, rank=rank, computed_at=now)
+            for rank, (tag_id, score) in enumerate(tag_ranking, start=1)
+        ])
+        TrendingContent.objects.bulk_create([
+            TrendingContent(content_id=content_id, score=score, rank=rank, computed_at=now)
+            for rank, (content_id, score) in enumerate(content_ranking, start=1)
+        ])
@@ -6,12 +6,19 @@ from apps.content.views import *
 urlpatterns = [
     path('contents/', ContentAPIView.as_view(), name='content-list'),
     path('grow/', GrowContentAPIView.as_view(), name='grow-contents'),
+    path('grow/since/', GrowSinceAPIView.as_view(), name='grow-since'),
     path('discover/', DiscoverContentAPIView.as_view(), name='discover-contents'),
+    path('feeds/cache-stats/', FeedCacheStatsAPIView.as_view(), name='feed-cache-stats'),
     path('contents/saved/', SavedContentAPIView.as_view(), name='content-saved'),
+    path('contents/trending/', TrendingContentAPIView.as_view(), name='content-trending'),
+    path('contents/impressions/', ImpressionAPIView.as_view(), name='content-impressions'),
     path('contents/<int:content_id>/', ContentDetailAPIView.as_view(), name='content-detail'),
     path('contents/<int:content_id>/like/', LikeAPIView.as_view(), name='content-like'),
     path('contents/<int:content_id>/save/', SaveContentAPIView.as_view(), name='content-save'),
+    path('contents/<int:content_id>/related/', RelatedContentAPIView.as_view(), name='content-related'),
+    path('contents/<int:content_id>/views/', ContentViewStatsAPIView.as_view(), name='content-views'),
     path('user/<str:username>/contents/', UserContentAPIView.as_view(), name='user-contents'),
     path('tags', TagListAPIView.as_view(), name='tag-list'),
+    path('tags/trending', TrendingTagListAPIView.as_view(), name='tag-trending'),
     path('reports/', ContentReportListView.as_view(), name='report-list')
 ]
@@ -0,0 +1,94 @@
+import atexit
+import logging
+from collections import Counter, defaultdict
+from threading import Event, Lock, Thread
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.content.models import Content, ContentViewDaily
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """
+    Write-behind view counter. Views are summed in memory per worker and written by a background thread every
+    VIEW_COUNT_FLUSH_INTERVAL seconds, or as soon as VIEW_COUNT_FLUSH_SIZE views are pending, as one
+    ``view_count + n`` UPDATE per distinct n plus one multi-row upsert of the daily rollup. Requests never wait
+    for, or fail with, a flush; a crashed worker loses at most one interval of views.
+    """
+
+    def __init__(self):
+        self.pending = Counter()
+        self.lock = Lock()
+        self.due = Event()
+        self.thread = None
+
+    def start(self) -> None:
+        """Starts the flush thread, again after a fork, which only copies the calling thread."""
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = Thread(target=self.run, name='view-counter', daemon=True)
+                self.thread.start()
+
+    def run(self) -> None:
+        while True:
+            self.due.wait(settings.VIEW_COUNT_FLUSH_INTERVAL)
+            self.due.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Flushing view counts failed, retrying with the next flush')
+            finally:
+                close_old_connections()
+
+    def record(self, content_ids) -> None:
+        if self.thread is None or not self.thread.is_alive():
+            self.start()
+        with self.lock:
+            self.pending.update(content_ids)
+            due = sum(self.pending.values()) >= settings.VIEW_COUNT_FLUSH_SIZE
+        if due:
+            self.due.set()
+
+    def flush(self) -> int:
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+        if not pending:
+            return 0
+        try:
+            self.write(pending)
+        except Exception:
+            with self.lock:
+                self.pending.update(pending)
+            raise
+        return sum(pending.values())
+
+    @staticmethod
+    def write(pending: Counter) -> None:
+        by_increment = defaultdict(list)
+        for content_id, views in pending.items():
+            by_increment[views].append(content_id)
+        today = timezone.localdate()
+        table = ContentViewDaily._meta.db_table
+        with transaction.atomic():
+            for views, content_ids in by_increment.items():
+                Content.objects.filter(id__in=content_ids).update(view_count=F('view_count') + views)
+            existing_ids = list(Content.objects.filter(id__in=pending).values_list('id', flat=True))
+            for start in range(0, len(existing_ids), settings.VIEW_COUNT_FLUSH_SIZE):
+                batch = existing_ids[start:start + settings.VIEW_COUNT_FLUSH_SIZE]
+                rows = ', '.join(['(%s, %s, %s)'] * len(batch))
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'INSERT INTO {table} (content_id, date, views) VALUES {rows} '
+                        f'ON CONFLICT (content_id, date) DO UPDATE SET views = {table}.views + EXCLUDED.views',
+                        [value for content_id in batch for value in (content_id, today, pending[content_id])]
+                    )
+
+
+view_counter = ViewCounter()
+atexit.register(view_counter.flush)
@@ -1,8 +1,11 @@
+from datetime import datetime, timedelta, timezone
+
+from django.db import transaction
+from django.db.models import F, Q
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework.generics import get_object_or_404
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
@@ -10,10 +13,19 @@ from rest_framework import status
 from apps.accounts.models import User
 from apps.content.filters import ContentFilter
 from apps.content.models import Content, Like, SavedContent, Tag, ContentReport
-from apps.content.serializers import TagSerializer, ContentSerializer, ContentWithoutUserSerializer, \
-    ContentReportSerializer, PaginatedContentSerializer, ContentListSerializer
+from apps.content.serializers import TagSerializer, ContentSerializer, ContentGridSerializer, \
+    ContentReportSerializer, PaginatedContentSerializer, ContentListSerializer, TrendingTagSerializer, \
+    FeedCacheStatsSerializer, ImpressionSerializer, FeedSinceQuerySerializer, FeedSinceSerializer, \
+    ContentViewStatsQuerySerializer, ContentViewStatsSerializer, PaginatedContentGridSerializer
+from apps.content.discover import get_discover_queryset
+from apps.content.feed_cache import feed_cache
+from apps.content.related import get_related_queryset
+from apps.content.seen import record_impressions
+from apps.content.timeline import get_timeline_queryset
+from apps.content.view_counts import view_counter
 from apps.notification.models import Notification
-from config.utils import PAGINATION_PARAMETERS
+from config.pagination import KeysetPagination
+from config.utils import CURSOR_PAGINATION_PARAMETERS, DYNAMIC_FIELDS_PARAMETERS
 
 CONTENT_MANUAL_PARAMETERS = [
     OpenApiParameter('search', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description="Searching"),
@@ -32,11 +44,11 @@ class ContentAPIView(APIView):
         responses={200: ContentSerializer(many=True)},
         tags=['Content'],
         description='Get user contents',
-        parameters=CONTENT_MANUAL_PARAMETERS
+        parameters=CONTENT_MANUAL_PARAMETERS + DYNAMIC_FIELDS_PARAMETERS
     )
     def get(self, request):
         contents = Content.objects.filter(user=request.user)
-        contents = contents.select_related('user').prefetch_related('tags', 'tagged_users')
+        contents = ContentSerializer.optimize_queryset(contents, request)
         content_filter = ContentFilter(data=request.GET, request=request, queryset=contents)
         filtered_contents= content_filter.qs if content_filter.is_valid() else contents.none()
         serializer = ContentSerializer(filtered_contents, many=True, context={'request': request})
@@ -63,14 +75,15 @@ class ContentDetailAPIView(APIView):
     @extend_schema(
         responses={200: ContentSerializer},
         tags=['Content'],
-        description='Get content info'
+        description='Get content info',
+        parameters=DYNAMIC_FIELDS_PARAMETERS
     )
     def get(self, request, content_id):
         content = get_object_or_404(
-            Content.objects.select_related('user').prefetch_related('tags', 'tagged_users'),
+            ContentSerializer.optimize_queryset(Content.objects.all(), request),
             id=content_id
         )
-        content.media.thumbnail = content.media.get_thumbnail()
+        view_counter.record([content.id])
         serializer = ContentSerializer(content, context={'request': request})
         return Response(serializer.data)
 
@@ -82,7 +95,7 @@ class ContentDetailAPIView(APIView):
     )
     def put(self, request, content_id):
         content = get_object_or_404(
-            Content.objects.select_related('user').prefetch_related('tags', 'tagged_users'),
+            ContentSerializer.optimize_queryset(Content.objects.all(), request),
             id=content_id
         )
         serializer = ContentSerializer(content, data=request.data, partial=True, context={'request': request})
@@ -102,21 +115,38 @@ class ContentDetailAPIView(APIView):
         return Response(status=204)
 
 
+class RelatedContentAPIView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        responses={200: ContentListSerializer(many=True)},
+        tags=['Content'],
+        description='Get contents related to a content',
+        parameters=DYNAMIC_FIELDS_PARAMETERS
+    )
+    def get(self, request, content_id):
+        queryset = ContentListSerializer.optimize_queryset(get_related_queryset(content_id), request)
+        serializer = ContentListSerializer(queryset, many=True, context={'request': request})
+        return Response(serializer.data)
+
+
 class UserContentAPIView(APIView):
-    serializer_class = ContentSerializer
+    serializer_class = ContentGridSerializer
     permission_classes = (AllowAny,)
 
     @extend_schema(
-        responses={200: ContentSerializer(many=True)},
+        responses={200: PaginatedContentGridSerializer()},
         tags=['User'],
-        description='Get all contents for user'
+        description='Get profile grid contents for user',
+        parameters=CURSOR_PAGINATION_PARAMETERS
     )
     def get(self, request, username=None):
         user = get_object_or_404(User, username=username)
-        contents = Content.objects.filter(user=user)
-        contents = contents.select_related('user').prefetch_related('tags', 'tagged_users')
-        serializer = ContentWithoutUserSerializer(contents, many=True, context={'request': request})
-        return Response(serializer.data)
+        contents = Content.objects.filter(user=user).only('media', *ContentGridSerializer.Meta.fields)
+        paginator = KeysetPagination()
+        paginated_queryset = paginator.paginate_queryset(contents, request)
+        serializer = ContentGridSerializer(paginated_queryset, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
 
 
 class LikeAPIView(APIView):
@@ -130,9 +160,13 @@ class LikeAPIView(APIView):
     )
     def post(self, request, content_id):
         content = get_object_or_404(Content, id=content_id)
-        like, created = Like.objects.get_or_create(user=request.user, content=content)
+        with transaction.atomic():
+            like, created = Like.objects.get_or_create(user=request.user, content=content)
+            if created:
+                Content.update_counter(content.id, 'like_count', 1)
         if created:
             Notification.objects.create(user=content.user, title=f'@{request.user.username} liked your content')
+        feed_cache.bump(request.user.id)
         return Response(status=status.HTTP_201_CREATED)
 
     @extend_schema(
@@ -142,7 +176,11 @@ class LikeAPIView(APIView):
     )
     def delete(self, request, content_id):
         content = get_object_or_404(Content, id=content_id)
-        Like.objects.filter(user=request.user, content=content).delete()
+        with transaction.atomic():
+            deleted, _ = Like.objects.filter(user=request.user, content=content).delete()
+            if deleted:
+                Content.update_counter(content.id, 'like_count', -deleted)
+        feed_cache.bump(request.user.id)
         return Response(status=204)
 
 
@@ -158,6 +196,7 @@ class SaveContentAPIView(APIView):
     def post(self, request, content_id):
         content = get_object_or_404(Content, id=content_id)
         SavedContent.objects.get_or_create(user=request.user, content=content)
+        feed_cache.bump(request.user.id)
         return Response(status=200)
 
     @extend_schema(
@@ -168,6 +207,7 @@ class SaveContentAPIView(APIView):
     def delete(self, request, content_id):
         content = get_object_or_404(Content, id=content_id)
         SavedContent.objects.filter(user=request.user, content=content).delete()
+        feed_cache.bump(request.user.id)
         return Response(status=204)
 
 
@@ -175,15 +215,19 @@ class SavedContentAPIView(APIView):
     permission_classes = (IsAuthenticated,)
 
     @extend_schema(
-        responses={200: ContentSerializer(many=True)},
+        responses={200: PaginatedContentSerializer()},
         tags=['Content'],
-        description='Get saved contents'
+        description='Get saved contents, most recently saved first',
+        parameters=CURSOR_PAGINATION_PARAMETERS + DYNAMIC_FIELDS_PARAMETERS
     )
     def get(self, request):
         contents = Content.objects.filter(saved__user=request.user)
-        contents = contents.select_related('user').prefetch_related('tags', 'tagged_users')
-        serializer = ContentSerializer(contents, many=True, context={'request': request})
-        return Response(serializer.data)
+        contents = contents.annotate(saved_at=F('saved__created_at'), saved_id=F('saved__id'))
+        queryset = ContentSerializer.optimize_queryset(contents, request)
+        paginator = KeysetPagination(ordering=('-saved_at', '-saved_id'))
+        paginated_queryset = paginator.paginate_queryset(queryset, request)
+        serializer = ContentSerializer(paginated_queryset, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
 
 
 class GrowContentAPIView(APIView):
@@ -193,18 +237,46 @@ class GrowContentAPIView(APIView):
         responses={200: PaginatedContentSerializer()},
         tags=['Content'],
         description='Get grow contents',
-        parameters=PAGINATION_PARAMETERS
+        parameters=CURSOR_PAGINATION_PARAMETERS + DYNAMIC_FIELDS_PARAMETERS
     )
     def get(self, request):
-        user = request.user
-        followed_users = User.objects.filter(followers__follower=user)
-        recommended_contents = Content.objects.filter(user__in=followed_users, type='content')
-        queryset = recommended_contents.select_related('user').prefetch_related('tags', 'tagged_users')
-        paginator = PageNumberPagination()
-        paginator.page_size_query_param = 'page_size'
+        cached_page = feed_cache.get(request, 'grow')
+        if cached_page is not None:
+            return Response(cached_page)
+        paginator = KeysetPagination()
+        position, reverse = paginator.decode_cursor(request)
+        page_size = paginator.get_page_size(request)
+        recommended_contents = get_timeline_queryset(request.user, position, reverse, page_size + 1)
+        queryset = ContentSerializer.optimize_queryset(recommended_contents, request)
         paginated_queryset = paginator.paginate_queryset(queryset, request)
         serializer = ContentSerializer(paginated_queryset, many=True, context={'request': request})
-        return paginator.get_paginated_response(serializer.data)
+        response = paginator.get_paginated_response(serializer.data)
+        feed_cache.set(request, 'grow', response.data)
+        return response
+
+
+class GrowSinceAPIView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        responses={200: FeedSinceSerializer},
+        tags=['Content'],
+        description='Get grow contents newer than the newest one the client has',
+        parameters=[FeedSinceQuerySerializer]
+    )
+    def get(self, request):
+        query_serializer = FeedSinceQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        since = query_serializer.validated_data
+        second_start = datetime.fromtimestamp(since['created_at'], tz=timezone.utc)
+        second_end = second_start + timedelta(seconds=1)
+        same_second = Q(created_at__gte=second_start, created_at__lt=second_end, id__gt=since['id'])
+        newer_contents = get_timeline_queryset(request.user, limit=since['limit'] + 1, since=second_start)
+        newer_contents = newer_contents.filter(Q(created_at__gte=second_end) | same_second)
+        queryset = ContentSerializer.optimize_queryset(newer_contents, request)
+        contents = list(queryset.order_by('-created_at', '-id')[:since['limit'] + 1])
+        serializer = ContentSerializer(contents[:since['limit']], many=True, context={'request': request})
+        return Response({'has_gap': len(contents) > since['limit'], 'results': serializer.data})
 
 
 class DiscoverContentAPIView(APIView):
@@ -214,19 +286,71 @@ class DiscoverContentAPIView(APIView):
         responses={200: PaginatedContentSerializer()},
         tags=['Content'],
         description='Get discover contents',
-        parameters=PAGINATION_PARAMETERS
+        parameters=CURSOR_PAGINATION_PARAMETERS + DYNAMIC_FIELDS_PARAMETERS
     )
     def get(self, request):
-        user = request.user
-        # discover_contents = Content.objects.filter(tags__in=user.interests.all())
-        # discover_contents = discover_contents.select_related('user').prefetch_related('tags', 'tagged_users')
-        discover_contents = Content.objects.filter(type='content').exclude(user=user)
-        queryset = discover_contents.select_related('user').prefetch_related('tags', 'tagged_users')
-        paginator = PageNumberPagination()
-        paginator.page_size_query_param = 'page_size'
+        cached_page = feed_cache.get(request, 'discover')
+        if cached_page is not None:
+            return Response(cached_page)
+        discover_contents, ordering = get_discover_queryset(request.user)
+        queryset = ContentSerializer.optimize_queryset(discover_contents, request)
+        paginator = KeysetPagination(ordering=ordering)
         paginated_queryset = paginator.paginate_queryset(queryset, request)
         serializer = ContentSerializer(paginated_queryset, many=True, context={'request': request})
-        return paginator.get_paginated_response(serializer.data)
+        response = paginator.get_paginated_response(serializer.data)
+        feed_cache.set(request, 'discover', response.data)
+        return response
+
+
+class ImpressionAPIView(APIView):
+    serializer_class = ImpressionSerializer
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        request=ImpressionSerializer,
+        responses={204: None},
+        tags=['Content'],
+        description='Record contents shown to the user'
+    )
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        record_impressions(request.user, serializer.validated_data['content_ids'])
+        view_counter.record(serializer.validated_data['content_ids'])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ContentViewStatsAPIView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        parameters=[ContentViewStatsQuerySerializer],
+        responses={200: ContentViewStatsSerializer},
+        tags=['Content'],
+        description='View count and daily views of own content. Views are written in batches, so the numbers may lag '
+                    'by a few seconds'
+    )
+    def get(self, request, content_id):
+        content = get_object_or_404(Content, id=content_id, user=request.user)
+        query = ContentViewStatsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        since = content.created_at.date()
+        since = max(since, datetime.now(timezone.utc).date() - timedelta(days=query.validated_data['days'] - 1))
+        daily = content.daily_views.filter(date__gte=since)
+        serializer = ContentViewStatsSerializer({'view_count': content.view_count, 'daily': daily})
+        return Response(serializer.data)
+
+
+class FeedCacheStatsAPIView(APIView):
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(
+        responses={200: FeedCacheStatsSerializer},
+        tags=['Content'],
+        description='Get feed page cache hit/miss counters'
+    )
+    def get(self, request):
+        return Response(FeedCacheStatsSerializer(feed_cache.stats()).data)
 
 
 class TagListAPIView(APIView):
@@ -244,6 +368,39 @@ class TagListAPIView(APIView):
         return Response(serializer.data)
 
 
+class TrendingTagListAPIView(APIView):
+    serializer_class = TrendingTagSerializer
+    permission_classes = (AllowAny,)
+
+    @extend_schema(
+        responses={200: serializer_class(many=True)},
+        tags=['Tag'],
+        description='Get trending tags'
+    )
+    def get(self, request):
+        tags = Tag.objects.filter(trending__isnull=False).select_related('trending').order_by('trending__rank')
+        serializer = self.serializer_class(tags, many=True, context={'request': request})
+        return Response(serializer.data)
+
+
+class TrendingContentAPIView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        responses={200: PaginatedContentSerializer()},
+        tags=['Content'],
+        description='Get trending contents',
+        parameters=CURSOR_PAGINATION_PARAMETERS + DYNAMIC_FIELDS_PARAMETERS
+    )
+    def get(self, request):
+        trending_contents = Content.objects.filter(trending__isnull=False).annotate(rank=F('trending__rank'))
+        queryset = ContentSerializer.optimize_queryset(trending_contents, request)
+        paginator = KeysetPagination(ordering=('rank', 'id'))
+        paginated_queryset = paginator.paginate_queryset(queryset, request)
+        serializer = ContentSerializer(paginated_queryset, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+
 class ContentReportListView(APIView):
     serializer_class = ContentReportSerializer
     permission_classes = (IsAuthenticated, )
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 20:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content_plan', '0002_contentplan_trial_description_subscription'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentplan',
+            name='banner_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
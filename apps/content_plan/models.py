@@ -21,6 +21,7 @@ class ContentPlan(models.Model):
     trial_discount_percent = models.PositiveIntegerField(null=True)
     trial_description = models.TextField(null=True)
     banner = models.ImageField(upload_to='banners/')
+    banner_variants = models.JSONField(default=dict, blank=True)
     is_active = models.BooleanField(default=True)
     description = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
@@ -3,6 +3,7 @@ from rest_framework import serializers
 
 from apps.content.serializers import ContentListSerializer
 from apps.content_plan.models import ContentPlan, Subscription
+from apps.media.serializers import ImageVariantsField
 from config.utils import TimestampField
 
 
@@ -12,12 +13,14 @@ class ContentPlanSerializer(serializers.ModelSerializer):
     subscriber_count = serializers.SerializerMethodField(read_only=True)
     length = serializers.SerializerMethodField(read_only=True)
     contents = ContentListSerializer(read_only=True, many=True)
+    banner_variants = ImageVariantsField('banner', 'cover')
 
     class Meta:
         model = ContentPlan
         fields = (
-            'id', 'name', 'price', 'price_type', 'banner', 'is_active', 'description', 'subscriber_count', 'length',
-            'trial_days', 'trial_discount_percent', 'trial_description', 'created_at', 'contents'
+            'id', 'name', 'price', 'price_type', 'banner', 'banner_variants', 'is_active', 'description',
+            'subscriber_count', 'length', 'trial_days', 'trial_discount_percent', 'trial_description', 'created_at',
+            'contents'
         )
 
     def get_subscriber_count(self, obj) -> int:
@@ -35,11 +38,12 @@ class ContentPlanSerializer(serializers.ModelSerializer):
 
 class ContentPlanListSerializer(serializers.ModelSerializer):
     created_at = TimestampField(read_only=True)
+    banner_variants = ImageVariantsField('banner', 'cover')
 
     class Meta:
         model = ContentPlan
         fields = (
-            'id', 'name', 'price', 'price_type', 'banner', 'is_active', 'description', 'created_at',
+            'id', 'name', 'price', 'price_type', 'banner', 'banner_variants', 'is_active', 'description', 'created_at',
         )
 
 
@@ -0,0 +1,21 @@
+from django.contrib import admin
+
+from apps.media.models import MediaBlob, MediaJob, UploadSession
+
+
+@admin.register(MediaJob)
+class MediaJobAdmin(admin.ModelAdmin):
+    list_display = ('content', 'kind', 'status', 'attempts', 'updated_at')
+    list_filter = ('kind', 'status')
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'purpose', 'filename', 'size', 'received', 'status', 'expires_at')
+    list_filter = ('purpose', 'status')
+
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'size', 'ref_count', 'created_at', 'used_at')
+    search_fields = ('sha256',)
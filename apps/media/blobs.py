@@ -0,0 +1,122 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.chat.models import Message
+from apps.content.models import Content
+from apps.media.models import MediaBlob, UploadSession
+
+BLOB_PREFIX = 'blobs/'
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def hash_file(file) -> str:
+    file.seek(0)
+    digest = hashlib.sha256()
+    for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+        digest.update(block)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def get_blob_name(digest: str, filename: str) -> str:
+    extension = os.path.splitext(filename)[1].lower()[:10]
+    return f'{BLOB_PREFIX}{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+def store_blob(file, filename: str | None = None) -> MediaBlob:
+    """
+    Returns the blob holding the file's bytes, saving them under their SHA-256 only if they are new. Uploads
+    received through the hashing upload handlers are not read again.
+    """
+    digest = getattr(file, 'sha256', None) or hash_file(file)
+    blob = MediaBlob.objects.filter(sha256=digest).first()
+    if blob is not None:
+        MediaBlob.objects.filter(id=blob.id).update(used_at=timezone.now())
+        return blob
+    name = get_blob_name(digest, filename or file.name)
+    if not default_storage.exists(name):
+        saved = default_storage.save(name, file)
+        if saved != name:
+            # The same bytes were saved by a concurrent upload meanwhile.
+            default_storage.delete(saved)
+    blob, _ = MediaBlob.objects.get_or_create(sha256=digest, defaults={'name': name, 'size': file.size})
+    return blob
+
+
+def is_blob_name(name: str | None) -> bool:
+    return bool(name) and name.startswith(BLOB_PREFIX)
+
+
+def acquire_blob(name: str) -> None:
+    if is_blob_name(name):
+        MediaBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+
+
+def release_blob(name: str) -> None:
+    """Unreferenced blobs are deleted by collect_media_blobs, so an upload in flight can still pick them up."""
+    if is_blob_name(name):
+        MediaBlob.objects.filter(name=name).update(ref_count=F('ref_count') - 1, used_at=timezone.now())
+
+
+def get_blob_outputs(name: str) -> dict:
+    """Outputs previously derived from the same bytes, e.g. ``{'thumbnail': <name>}``."""
+    if not is_blob_name(name):
+        return {}
+    return MediaBlob.objects.filter(name=name).values_list('outputs', flat=True).first() or {}
+
+
+def get_blob_output(name: str, key: str):
+    return get_blob_outputs(name).get(key)
+
+
+def set_blob_outputs(name: str, **outputs) -> None:
+    if not is_blob_name(name):
+        return
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+        if blob is not None:
+            blob.outputs.update(outputs)
+            blob.save(update_fields=['outputs'])
+
+
+def get_output_names(outputs: dict) -> list[str]:
+    names = []
+    for key, value in outputs.items():
+        if key.endswith('_variants'):
+            names.extend(name for size, name in value.items() if size != 'source')
+        elif key == 'stream':
+            directory = os.path.dirname(value)
+            if default_storage.exists(directory):
+                names.extend(os.path.join(directory, file) for file in default_storage.listdir(directory)[1])
+        elif key == 'thumbnail':
+            names.append(value)
+    return names
+
+
+def is_referenced(name: str) -> bool:
+    # Counts can drift when media is replaced, so the rows are checked before anything is deleted.
+    return (
+        Content.objects.filter(media=name).exists()
+        or Message.objects.filter(media=name).exists()
+        or UploadSession.objects.filter(media=name, status=UploadSession.Status.COMPLETE).exists()
+    )
+
+
+def collect_blobs() -> int:
+    """Deletes blobs nothing has used for MEDIA_BLOB_GRACE_PERIOD, along with their derived outputs."""
+    since = timezone.now() - settings.MEDIA_BLOB_GRACE_PERIOD
+    collected = 0
+    for blob in MediaBlob.objects.filter(ref_count__lte=0, used_at__lt=since).iterator():
+        if is_referenced(blob.name):
+            continue
+        for name in [blob.name, *get_output_names(blob.outputs)]:
+            default_storage.delete(name)
+        blob.delete()
+        collected += 1
+    return collected
@@ -0,0 +1,32 @@
+import json
+
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from apps.media.jobs import get_status_group
+
+
+class MediaStatusConsumer(AsyncWebsocketConsumer):
+    """Pushes the processing outcome of the connected user's uploads."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.group_name = None
+
+    async def connect(self):
+        user = self.scope['user']
+        if not user.is_authenticated:
+            await self.close()
+            return
+        self.group_name = get_status_group(user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def media_status(self, event):
+        await self.send(text_data=json.dumps({
+            'content_id': event['content_id'],
+            'media_status': event['media_status'],
+        }))
@@ -0,0 +1,186 @@
+import mimetypes
+import os
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.db.models import F, Q
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from apps.chat.models import Message
+from apps.content.models import Content
+from apps.media.blobs import BLOB_PREFIX
+from apps.media.models import UploadSession
+
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+VARIANT_PATTERN = re.compile(r'^(.+)_\d+\.(webp|jpg|png)$')
+ACCESS_CACHE_TIMEOUT = 60
+# Upload locations only ever served through a Content, Message or UploadSession that grants access.
+PRIVATE_MEDIA_PREFIXES = (BLOB_PREFIX, 'contents/', 'messages/')
+
+
+class FileRange:
+    """``length`` bytes of an open file from its current position; ``fileno()`` lets the WSGI server sendfile them."""
+
+    def __init__(self, file, length: int):
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def get_media_path(name: str) -> str:
+    try:
+        path = safe_join(settings.MEDIA_ROOT, name)
+    except SuspiciousFileOperation:
+        raise Http404
+    if os.path.commonpath([path, settings.UPLOAD_TEMP_DIR]) == settings.UPLOAD_TEMP_DIR or not os.path.isfile(path):
+        raise Http404
+    return path
+
+
+def get_source_name(name: str) -> str:
+    """The upload a thumbnail or HLS segment was derived from."""
+    return name.split('_hls/')[0].removesuffix('_thumbnail.jpg')
+
+
+def get_source_filter(name: str, *fields) -> Q:
+    """
+    Matches the ``media`` an upload, its thumbnail, HLS segments or image variants were derived from, or ``fields``
+    holding the file itself.
+    """
+    source = get_source_name(name)
+    condition = Q(media=source)
+    variant = VARIANT_PATTERN.match(source)
+    if variant:
+        condition |= Q(media__startswith=f'{variant.group(1)}.')
+    for field in fields:
+        condition |= Q(**{field: name})
+    return condition
+
+
+def get_access_version_key(user_id) -> str:
+    return f'media-access:version:{user_id}'
+
+
+def reset_media_access(user_id) -> None:
+    """Drops the cached access decisions of a user, e.g. once a subscription unlocks a content plan."""
+    cache.set(get_access_version_key(user_id), time.time_ns(), None)
+
+
+def can_access_media(user, name: str) -> bool:
+    """
+    Content media is public unless every content using it belongs to a content plan the user neither owns nor
+    subscribes to; message media is limited to chat participants. Uploads nothing uses yet are only served to their
+    uploader, while other media, such as avatars, covers and banners, is public.
+    """
+    version = cache.get(get_access_version_key(user.pk), 0)
+    key = f'media-access:{user.pk}:{version}:{name.split("_hls/")[0]}'
+    allowed = cache.get(key)
+    if allowed is None:
+        contents = Content.objects.filter(get_source_filter(name, 'thumbnail', 'media_preview'))
+        messages = Message.objects.filter(get_source_filter(name, 'thumbnail'))
+        if contents.exists():
+            visible = Q(content_plan__isnull=True)
+            if user.is_authenticated:
+                visible |= Q(user=user) | Q(content_plan__users__user=user)
+                # A message only shares content media its sender uploaded for a chat, not any path it names.
+                messages = messages.filter(
+                    sender__upload_sessions__purpose=UploadSession.Purpose.MESSAGE,
+                    sender__upload_sessions__media=F('media')
+                )
+            allowed = contents.filter(visible).exists() or (
+                user.is_authenticated and messages.filter(chat__participants=user).exists()
+            )
+        elif messages.exists():
+            allowed = user.is_authenticated and messages.filter(chat__participants=user).exists()
+        elif name.startswith(PRIVATE_MEDIA_PREFIXES):
+            allowed = user.is_authenticated and user.upload_sessions.filter(media=get_source_name(name)).exists()
+        else:
+            allowed = True
+        cache.set(key, allowed, ACCESS_CACHE_TIMEOUT)
+    return allowed
+
+
+def get_etag(stat) -> str:
+    return quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """``(start, length)`` of a single ``bytes=`` range; multiple ranges are answered with the whole file."""
+    match = RANGE_PATTERN.match(header or '')
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if not start:
+        length = min(int(end), size)
+        return size - length, length
+    end = min(int(end), size - 1) if end else size - 1
+    return int(start), end - int(start) + 1
+
+
+def offload_response(name: str, path: str) -> HttpResponse | None:
+    """Hands the transfer to the front web server, which then handles ranges and conditional requests itself."""
+    response = HttpResponse(content_type=mimetypes.guess_type(name)[0] or 'application/octet-stream')
+    if settings.MEDIA_ACCEL_REDIRECT_PREFIX:
+        response['X-Accel-Redirect'] = f'{settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip("/")}/{name}'
+    elif settings.MEDIA_SENDFILE_HEADER:
+        response[settings.MEDIA_SENDFILE_HEADER] = path
+    else:
+        return None
+    return response
+
+
+def file_response(request, path: str) -> HttpResponse:
+    stat = os.stat(path)
+    etag, last_modified = get_etag(stat), int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        byte_range = parse_range(request.headers.get('Range'), stat.st_size)
+        if_range = request.headers.get('If-Range')
+        if if_range and if_range not in (etag, http_date(last_modified)):
+            byte_range = None
+        if byte_range and (byte_range[0] >= stat.st_size or byte_range[1] <= 0):
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+        file = open(path, 'rb')
+        if byte_range:
+            start, length = byte_range
+            file.seek(start)
+            response = FileResponse(FileRange(file, length), status=206)
+            response['Content-Range'] = f'bytes {start}-{start + length - 1}/{stat.st_size}'
+            response['Content-Length'] = length
+        else:
+            response = FileResponse(file)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def serve_media(request, user, name: str) -> HttpResponse:
+    path = get_media_path(name)
+    if not can_access_media(user, name):
+        raise Http404
+    response = offload_response(name, path) or file_response(request, path)
+    if response.status_code in (200, 206, 304):
+        patch_cache_control(response, max_age=settings.MEDIA_CACHE_MAX_AGE, private=True)
+    return response
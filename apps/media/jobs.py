@@ -0,0 +1,136 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.content.models import Content
+from apps.media.models import MediaJob
+from apps.media.processors import PROCESSORS
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.MEDIA_WORKERS, thread_name_prefix='media')
+        return _executor
+
+
+def get_status_group(user_id: int) -> str:
+    return f'media_{user_id}'
+
+
+def get_job_kinds(content: Content) -> list[str]:
+    if content.media_type == Content.ContentMediaType.VIDEO:
+        return [MediaJob.Kind.PROBE, MediaJob.Kind.THUMBNAIL, MediaJob.Kind.HLS]
+    if content.media_type == Content.ContentMediaType.IMAGE:
+        return [MediaJob.Kind.PROBE, MediaJob.Kind.IMAGE_VARIANTS]
+    if content.media_type == Content.ContentMediaType.AUDIO:
+        return [MediaJob.Kind.PROBE, MediaJob.Kind.WAVEFORM]
+    return []
+
+
+def enqueue_media_jobs(content: Content) -> list[MediaJob]:
+    """Creates the processing jobs of a new upload; they are handed to the worker pool once the upload commits."""
+    kinds = get_job_kinds(content)
+    if not kinds:
+        return []
+    jobs = MediaJob.objects.bulk_create([MediaJob(content=content, kind=kind) for kind in kinds])
+    content.media_status = Content.MediaStatus.PENDING
+    Content.objects.filter(id=content.id).update(media_status=content.media_status)
+    job_ids = [job.id for job in jobs]
+    transaction.on_commit(lambda: submit(*job_ids))
+    return jobs
+
+
+def submit(*job_ids, delay: float = 0) -> None:
+    for job_id in job_ids:
+        if settings.MEDIA_JOBS_EAGER:
+            run_job(job_id)
+        elif delay:
+            timer = threading.Timer(delay, submit, args=(job_id,))
+            timer.daemon = True
+            timer.start()
+        else:
+            get_executor().submit(run_task, run_job, job_id)
+
+
+def run_task(func, *args) -> None:
+    close_old_connections()
+    try:
+        func(*args)
+    finally:
+        close_old_connections()
+
+
+def run_in_background(func, *args) -> None:
+    """Runs ``func`` on the worker pool once the current transaction commits, without a job record."""
+    if settings.MEDIA_JOBS_EAGER:
+        transaction.on_commit(lambda: func(*args))
+    else:
+        transaction.on_commit(lambda: get_executor().submit(run_task, func, *args))
+
+
+def claim_job(job_id: int) -> MediaJob | None:
+    claimed = MediaJob.objects.filter(id=job_id, status=MediaJob.Status.PENDING).update(
+        status=MediaJob.Status.RUNNING, attempts=F('attempts') + 1, updated_at=timezone.now()
+    )
+    return MediaJob.objects.select_related('content').get(id=job_id) if claimed else None
+
+
+def run_job(job_id: int) -> None:
+    """Runs a pending job; failures are retried with exponential backoff up to MEDIA_JOB_MAX_ATTEMPTS times."""
+    job = claim_job(job_id)
+    if job is None:
+        return
+    try:
+        PROCESSORS[job.kind](job.content)
+    except Exception as error:
+        job.error = str(error) or error.__class__.__name__
+        if job.attempts < settings.MEDIA_JOB_MAX_ATTEMPTS:
+            delay = settings.MEDIA_JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            job.status = MediaJob.Status.PENDING
+            job.run_after = timezone.now() + timedelta(seconds=delay)
+            job.save(update_fields=['status', 'error', 'run_after', 'updated_at'])
+            submit(job.id, delay=delay)
+            return
+        job.status = MediaJob.Status.FAILED
+    else:
+        job.status = MediaJob.Status.DONE
+        job.error = None
+    job.save(update_fields=['status', 'error', 'updated_at'])
+    update_media_status(job.content)
+
+
+def update_media_status(content: Content) -> None:
+    """Marks the content ready or failed once none of its jobs is left to run and pushes the outcome."""
+    statuses = set(MediaJob.objects.filter(content_id=content.id).values_list('status', flat=True))
+    if statuses & {MediaJob.Status.PENDING, MediaJob.Status.RUNNING}:
+        return
+    failed = MediaJob.Status.FAILED in statuses
+    content.media_status = Content.MediaStatus.FAILED if failed else Content.MediaStatus.READY
+    Content.objects.filter(id=content.id).update(media_status=content.media_status)
+    async_to_sync(get_channel_layer().group_send)(get_status_group(content.user_id), {
+        'type': 'media_status',
+        'content_id': content.id,
+        'media_status': content.media_status,
+    })
+
+
+def requeue_stale_jobs() -> list[int]:
+    """Due pending jobs plus running jobs whose worker died, e.g. on a restart."""
+    now = timezone.now()
+    MediaJob.objects.filter(
+        status=MediaJob.Status.RUNNING, updated_at__lt=now - settings.MEDIA_JOB_TIMEOUT
+    ).update(status=MediaJob.Status.PENDING, updated_at=now)
+    due = MediaJob.objects.filter(status=MediaJob.Status.PENDING, run_after__lte=now)
+    return list(due.order_by('run_after').values_list('id', flat=True))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.media.blobs import collect_blobs
+
+
+class Command(BaseCommand):
+    help = 'Delete stored media that is no longer referenced, with its thumbnails, streams and variants'
+
+    def handle(self, *args, **options):
+        collected = collect_blobs()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {collected} media blobs'))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from apps.content.models import Content
+from apps.media.variants import (
+    VARIANT_FIELDS, get_placeholder_field, get_variants_field, has_placeholder, needs_variants, refresh_image_variants
+)
+
+
+class Command(BaseCommand):
+    help = 'Render the missing or outdated variants and placeholders of uploaded images'
+
+    def handle(self, *args, **options):
+        fields = [(model, field_name, kind) for model, model_fields in VARIANT_FIELDS.items()
+                  for field_name, kind in model_fields]
+        fields.append((Content, 'media', 'feed'))
+        rendered = 0
+        for model, field_name, kind in fields:
+            queryset = model.objects.exclude(Q(**{f'{field_name}__isnull': True}) | Q(**{field_name: ''}))
+            if model is Content:
+                queryset = queryset.filter(media_type=Content.ContentMediaType.IMAGE)
+            placeholder_field = get_placeholder_field(field_name) if has_placeholder(model, field_name) else None
+            only_fields = ['pk', field_name, get_variants_field(field_name), *filter(None, [placeholder_field])]
+            for instance in queryset.only(*only_fields).iterator():
+                missing_placeholder = placeholder_field and not getattr(instance, placeholder_field)
+                if needs_variants(instance, field_name) or missing_placeholder:
+                    refresh_image_variants(model, instance.pk, field_name, kind)
+                    rendered += 1
+        self.stdout.write(self.style.SUCCESS(f'Rendered variants for {rendered} images'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apps.media.jobs import requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Run media jobs that are due or were left behind by a stopped worker'
+
+    def handle(self, *args, **options):
+        job_ids = requeue_stale_jobs()
+        for job_id in job_ids:
+            run_job(job_id)
+        self.stdout.write(self.style.SUCCESS(f'Processed {len(job_ids)} media jobs'))
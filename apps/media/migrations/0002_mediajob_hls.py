@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 20:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mediajob',
+            name='kind',
+            field=models.CharField(choices=[('thumbnail', 'Thumbnail'), ('hls', 'HLS ladder')], max_length=20),
+        ),
+    ]
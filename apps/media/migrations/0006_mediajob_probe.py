@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 21:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media', '0005_media_blob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mediajob',
+            name='kind',
+            field=models.CharField(choices=[('probe', 'Probe'), ('thumbnail', 'Thumbnail'), ('hls', 'HLS ladder'), ('image_variants', 'Image variants')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,107 @@
+import os
+import uuid
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.content.models import Content
+
+
+class MediaJob(models.Model):
+
+    class Kind(models.TextChoices):
+        PROBE = 'probe', 'Probe'
+        THUMBNAIL = 'thumbnail', 'Thumbnail'
+        HLS = 'hls', 'HLS ladder'
+        IMAGE_VARIANTS = 'image_variants', 'Image variants'
+        WAVEFORM = 'waveform', 'Waveform'
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    content = models.ForeignKey(Content, on_delete=models.CASCADE, related_name='media_jobs')
+    kind = models.CharField(max_length=20, choices=Kind)
+    status = models.CharField(max_length=10, choices=Status, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(null=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'media_jobs'
+        ordering = ('created_at',)
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+        verbose_name = 'media job'
+        verbose_name_plural = 'media jobs'
+
+    def __str__(self):
+        return f'{self.kind} of {self.content_id}: {self.status}'
+
+
+class MediaBlob(models.Model):
+    """Uploaded bytes stored once under their SHA-256, with the outputs derived from them."""
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.IntegerField(default=0)
+    outputs = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'media_blobs'
+        verbose_name = 'media blob'
+        verbose_name_plural = 'media blobs'
+
+    def __str__(self):
+        return self.name
+
+
+def get_upload_expiry():
+    return timezone.now() + settings.UPLOAD_SESSION_TTL
+
+
+class UploadSession(models.Model):
+
+    class Purpose(models.TextChoices):
+        CONTENT = 'content', 'Content'
+        MESSAGE = 'message', 'Message'
+
+    class Status(models.TextChoices):
+        OPEN = 'open', 'Open'
+        COMPLETE = 'complete', 'Complete'
+        USED = 'used', 'Used'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    purpose = models.CharField(max_length=10, choices=Purpose)
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=Status, default=Status.OPEN)
+    media = models.CharField(max_length=255, null=True)
+    expires_at = models.DateTimeField(default=get_upload_expiry, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'media_upload_sessions'
+        verbose_name = 'upload session'
+        verbose_name_plural = 'upload sessions'
+
+    def __str__(self):
+        return f'{self.filename} ({self.received}/{self.size})'
+
+    @property
+    def temporary_path(self) -> str:
+        return os.path.join(settings.UPLOAD_TEMP_DIR, f'{self.id}.part')
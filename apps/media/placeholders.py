@@ -0,0 +1,57 @@
+import math
+
+import numpy as np
+from django.conf import settings
+from PIL import Image, ImageOps
+
+BASE83 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~'
+
+
+def encode_base83(value: int, length: int) -> str:
+    return ''.join(BASE83[value // 83 ** (length - 1 - index) % 83] for index in range(length))
+
+
+def srgb_to_linear(values: np.ndarray) -> np.ndarray:
+    values = values / 255
+    return np.where(values <= 0.04045, values / 12.92, ((values + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_srgb(value: float) -> int:
+    value = min(max(value, 0), 1)
+    value = value * 12.92 if value <= 0.0031308 else 1.055 * value ** (1 / 2.4) - 0.055
+    return int(value * 255 + 0.5)
+
+
+def encode_blurhash(image: Image.Image, x_components: int, y_components: int) -> str:
+    """The BlurHash (https://blurha.sh) of an image; meant for images already shrunk to a few dozen pixels."""
+    pixels = srgb_to_linear(np.asarray(image.convert('RGB'), dtype=np.float64))
+    height, width = pixels.shape[:2]
+    cos_y = np.cos(np.pi * np.outer(np.arange(y_components), np.arange(height)) / height)
+    cos_x = np.cos(np.pi * np.outer(np.arange(x_components), np.arange(width)) / width)
+    factors = np.einsum('jh,iw,hwc->jic', cos_y, cos_x, pixels) / (width * height)
+    factors[1:] *= 2
+    factors[0, 1:] *= 2
+    factors = factors.reshape(-1, 3)
+    dc, ac = factors[0], factors[1:]
+
+    blurhash = encode_base83(x_components - 1 + (y_components - 1) * 9, 1)
+    if len(ac):
+        quantised_maximum = max(0, min(82, math.floor(np.abs(ac).max() * 166 - 0.5)))
+        maximum = (quantised_maximum + 1) / 166
+    else:
+        quantised_maximum, maximum = 0, 1
+    blurhash += encode_base83(quantised_maximum, 1)
+    blurhash += encode_base83((linear_to_srgb(dc[0]) << 16) + (linear_to_srgb(dc[1]) << 8) + linear_to_srgb(dc[2]), 4)
+    quantised = np.clip(np.floor(np.sign(ac) * np.sqrt(np.abs(ac / maximum)) * 9 + 9.5), 0, 18).astype(int)
+    for red, green, blue in quantised:
+        blurhash += encode_base83(red * 19 * 19 + green * 19 + blue, 2)
+    return blurhash
+
+
+def make_placeholder(file) -> str:
+    """BlurHash of an image file, computed from a PLACEHOLDER_SIZE pixel thumbnail of it."""
+    with Image.open(file) as image:
+        image.draft('RGB', (settings.PLACEHOLDER_SIZE, settings.PLACEHOLDER_SIZE))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((settings.PLACEHOLDER_SIZE, settings.PLACEHOLDER_SIZE))
+        return encode_blurhash(image, *settings.PLACEHOLDER_COMPONENTS)
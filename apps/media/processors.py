@@ -0,0 +1,250 @@
+import os
+
+import ffmpeg
+import numpy as np
+from django.conf import settings
+from django.core.files.storage import default_storage
+from PIL import ExifTags, Image, UnidentifiedImageError
+
+from apps.chat.models import Message
+from apps.content.models import Content
+from apps.media.blobs import get_blob_output, get_blob_outputs, set_blob_outputs
+from apps.media.models import MediaJob
+from apps.media.placeholders import make_placeholder
+from apps.media.variants import refresh_image_variants
+from apps.media.waveforms import compute_peaks
+
+
+class MediaProcessingError(Exception):
+    pass
+
+
+def run_ffmpeg(stream) -> bytes:
+    try:
+        return stream.overwrite_output().run(capture_stdout=True, capture_stderr=True)[0]
+    except ffmpeg.Error as error:
+        raise MediaProcessingError(error.stderr.decode(errors='replace')[-1000:]) from error
+
+
+def extract_media_thumbnail(name: str) -> str:
+    """Writes ``<media>_thumbnail.jpg`` unless one was already extracted from the same bytes; returns its name."""
+    thumbnail_name = get_blob_output(name, 'thumbnail')
+    if thumbnail_name is None:
+        thumbnail_name = f'{name}_thumbnail.jpg'
+        path = default_storage.path(name)
+        run_ffmpeg(ffmpeg.input(path, ss=1).output(f'{path}_thumbnail.jpg', vframes=1))
+        set_blob_outputs(name, thumbnail=thumbnail_name)
+    return thumbnail_name
+
+
+def get_media_placeholder(name: str, image_name: str) -> str:
+    """Placeholder of ``image_name``, the upload itself or its thumbnail, computed once per distinct upload."""
+    placeholder = get_blob_output(name, 'placeholder')
+    if placeholder is None:
+        with default_storage.open(image_name) as image:
+            placeholder = make_placeholder(image)
+        set_blob_outputs(name, placeholder=placeholder)
+    return placeholder
+
+
+def decode_audio(path: str) -> np.ndarray:
+    """The audio of a file as 16-bit mono samples at WAVEFORM_SAMPLE_RATE."""
+    stream = ffmpeg.input(path).output(
+        'pipe:', format='s16le', acodec='pcm_s16le', ac=1, ar=settings.WAVEFORM_SAMPLE_RATE
+    )
+    return np.frombuffer(run_ffmpeg(stream), dtype='<i2')
+
+
+def get_media_waveform(name: str) -> bytes:
+    """WAVEFORM_BUCKETS int8 peaks of an audio upload, decoded once per distinct upload."""
+    waveform = get_blob_output(name, 'waveform')
+    if waveform is None:
+        waveform = compute_peaks(decode_audio(default_storage.path(name)), settings.WAVEFORM_BUCKETS).tolist()
+        set_blob_outputs(name, waveform=waveform)
+    return np.asarray(waveform, dtype=np.int8).tobytes()
+
+
+def extract_thumbnail(content: Content) -> None:
+    thumbnail_name = extract_media_thumbnail(content.media.name)
+    Content.objects.filter(id=content.id).update(
+        thumbnail=thumbnail_name, media_placeholder=get_media_placeholder(content.media.name, thumbnail_name)
+    )
+
+
+def get_rotation(stream: dict) -> int:
+    rotation = stream.get('tags', {}).get('rotate')
+    for side_data in stream.get('side_data_list', []):
+        rotation = side_data.get('rotation', rotation)
+    return abs(int(rotation or 0))
+
+
+def probe_file(path: str) -> dict:
+    """
+    ``width``, ``height`` (as displayed), ``duration`` in seconds, ``codec`` and ``bitrate`` in bit/s of an image,
+    video or audio file; ``{}`` for other files. Images only have their header read.
+    """
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+            if image.getexif().get(ExifTags.Base.Orientation) in (5, 6, 7, 8):
+                width, height = height, width
+            return {'width': width, 'height': height, 'duration': None, 'codec': image.format.lower(), 'bitrate': None}
+    except UnidentifiedImageError:
+        pass
+    try:
+        probe = ffmpeg.probe(path)
+    except ffmpeg.Error:
+        return {}
+    streams = [stream for stream in probe['streams'] if not stream.get('disposition', {}).get('attached_pic')]
+    video = next((stream for stream in streams if stream['codec_type'] == 'video'), None)
+    stream = video or next((stream for stream in streams if stream['codec_type'] == 'audio'), None)
+    if stream is None:
+        return {}
+    width, height = (int(video['width']), int(video['height'])) if video else (None, None)
+    if video and get_rotation(video) in (90, 270):
+        width, height = height, width
+    container = probe.get('format', {})
+    duration = container.get('duration') or stream.get('duration')
+    bitrate = container.get('bit_rate') or stream.get('bit_rate')
+    return {
+        'width': width, 'height': height, 'duration': float(duration) if duration else None,
+        'codec': stream.get('codec_name'), 'bitrate': int(bitrate) if bitrate else None,
+    }
+
+
+def get_media_probe(name: str) -> dict:
+    """Probes a stored file once per distinct bytes; later uploads of the same file reuse the result."""
+    probe = get_blob_output(name, 'probe')
+    if probe is None:
+        probe = probe_file(default_storage.path(name))
+        set_blob_outputs(name, probe=probe)
+    return probe
+
+
+def apply_media_probe(model, pk) -> None:
+    """Stores the probe of a Content or Message upload on its row, replacing the client's aspect ratio."""
+    name = model.objects.filter(pk=pk).values_list('media', flat=True).first()
+    if not name:
+        return
+    probe = get_media_probe(name)
+    if not probe:
+        return
+    fields = {f'media_{key}': value for key, value in probe.items()}
+    if probe['width'] and probe['height']:
+        fields['media_aspect_ratio'] = probe['width'] / probe['height']
+    # Skipped if the media was replaced meanwhile; the new upload is probed on its own.
+    model.objects.filter(pk=pk, media=name).update(**fields)
+
+
+def probe_content(content: Content) -> None:
+    apply_media_probe(Content, content.id)
+
+
+def get_hls_ladder(width: int, height: int) -> list[tuple[int, int, int, int]]:
+    """
+    ``(width, height, video kbit/s, audio kbit/s)`` of the HLS_RENDITIONS whose short side is not longer than the
+    source's, or the source size at the smallest bitrates for sources below the lowest rung.
+    """
+    short_side = min(width, height)
+    renditions = [rendition for rendition in settings.HLS_RENDITIONS if rendition[0] <= short_side]
+    if not renditions:
+        renditions = [(short_side, *settings.HLS_RENDITIONS[0][1:])]
+    return [
+        (max(2, round(width * side / short_side / 2) * 2), max(2, round(height * side / short_side / 2) * 2), video,
+         audio)
+        for side, video, audio in renditions
+    ]
+
+
+def get_rendition_name(width: int, height: int) -> str:
+    return f'{min(width, height)}p'
+
+
+def build_master_playlist(ladder) -> str:
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3']
+    for width, height, video, audio in ladder:
+        lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={(video + audio) * 1000},RESOLUTION={width}x{height}')
+        lines.append(f'{get_rendition_name(width, height)}.m3u8')
+    return '\n'.join(lines) + '\n'
+
+
+def write_hls_renditions(field_file, width: int, height: int) -> str:
+    """Writes one keyframe-aligned HLS rendition per ladder rung and a master playlist next to the upload."""
+    ladder = get_hls_ladder(width, height)
+    directory = f'{field_file.path}_hls'
+    os.makedirs(directory, exist_ok=True)
+    segment_seconds = settings.HLS_SEGMENT_SECONDS
+    for rendition_width, rendition_height, video, audio in ladder:
+        name = get_rendition_name(rendition_width, rendition_height)
+        run_ffmpeg(ffmpeg.input(field_file.path).output(
+            os.path.join(directory, f'{name}.m3u8'),
+            vf=f'scale={rendition_width}:{rendition_height}',
+            vcodec='libx264', preset='veryfast', pix_fmt='yuv420p',
+            video_bitrate=f'{video}k', maxrate=f'{video}k', bufsize=f'{video * 2}k',
+            force_key_frames=f'expr:gte(t,n_forced*{segment_seconds})', sc_threshold=0,
+            acodec='aac', audio_bitrate=f'{audio}k', ac=2,
+            f='hls', hls_time=segment_seconds, hls_playlist_type='vod',
+            hls_segment_filename=os.path.join(directory, f'{name}_%03d.ts')
+        ))
+    with open(os.path.join(directory, 'master.m3u8'), 'w') as playlist:
+        playlist.write(build_master_playlist(ladder))
+    return f'{field_file.name}_hls/master.m3u8'
+
+
+def transcode_hls(content: Content) -> None:
+    stream = get_blob_output(content.media.name, 'stream')
+    if stream is None:
+        probe = get_media_probe(content.media.name)
+        if not probe.get('width'):
+            raise MediaProcessingError('No video stream')
+        stream = write_hls_renditions(content.media, probe['width'], probe['height'])
+        set_blob_outputs(content.media.name, stream=stream)
+    Content.objects.filter(id=content.id).update(stream=stream)
+
+
+def render_content_variants(content: Content) -> None:
+    outputs = get_blob_outputs(content.media.name)
+    if 'feed_variants' in outputs:
+        Content.objects.filter(id=content.id, media=content.media.name).update(
+            media_variants=outputs['feed_variants'], media_placeholder=outputs.get('placeholder')
+        )
+        return
+    updates = refresh_image_variants(Content, content.id, 'media', 'feed')
+    if updates:
+        set_blob_outputs(
+            content.media.name, feed_variants=updates['media_variants'], placeholder=updates['media_placeholder']
+        )
+
+
+def render_waveform(content: Content) -> None:
+    waveform = get_media_waveform(content.media.name)
+    Content.objects.filter(id=content.id, media=content.media.name).update(media_waveform=waveform)
+
+
+def process_message_media(message_id: int) -> None:
+    """Probes a chat upload and stores the waveform of a voice message or the placeholder of an image or video."""
+    apply_media_probe(Message, message_id)
+    message = Message.objects.filter(id=message_id).only('media', 'media_type', 'thumbnail').first()
+    if message is None or not message.media:
+        return
+    if message.media_type == Message.MessageMediaTypeEnum.VOICE:
+        waveform = get_media_waveform(message.media.name)
+        Message.objects.filter(id=message_id, media=message.media.name).update(media_waveform=waveform)
+        return
+    if message.media_type == Message.MessageMediaTypeEnum.IMAGE:
+        image_name = message.media.name
+    elif message.media_type == Message.MessageMediaTypeEnum.VIDEO and message.thumbnail:
+        image_name = message.thumbnail.name
+    else:
+        return
+    placeholder = get_media_placeholder(message.media.name, image_name)
+    Message.objects.filter(id=message_id, media=message.media.name).update(media_placeholder=placeholder)
+
+
+PROCESSORS = {
+    MediaJob.Kind.PROBE: probe_content,
+    MediaJob.Kind.THUMBNAIL: extract_thumbnail,
+    MediaJob.Kind.HLS: transcode_hls,
+    MediaJob.Kind.IMAGE_VARIANTS: render_content_variants,
+    MediaJob.Kind.WAVEFORM: render_waveform,
+}
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .consumers import MediaStatusConsumer
+
+websocket_urlpatterns = [
+    path('ws/media/', MediaStatusConsumer.as_asgi()),
+]
@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.core.cache import cache
+from drf_spectacular.utils import extend_schema_field
+from rest_framework import serializers
+
+from apps.content.models import Content
+from apps.media.jobs import run_in_background
+from apps.media.models import MediaJob, UploadSession
+from apps.media.variants import get_variants_field, needs_variants, refresh_image_variants
+from config.utils import TimestampField
+
+VARIANT_REQUEST_TIMEOUT = 10 * 60
+
+
+def get_variant_urls(instance, field_name: str, kind: str, request=None) -> dict[str, str] | None:
+    """
+    ``{size: url}`` of the image variants, ``None`` without an image. Images uploaded before variants existed
+    get them rendered in the background on first read, and ``{}`` meanwhile.
+    """
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        return None
+    if needs_variants(instance, field_name):
+        key = f'image-variants:{instance._meta.label_lower}:{instance.pk}:{field_name}'
+        if cache.add(key, True, VARIANT_REQUEST_TIMEOUT):
+            run_in_background(refresh_image_variants, type(instance), instance.pk, field_name, kind)
+        return {}
+    urls = {}
+    for size, name in getattr(instance, get_variants_field(field_name)).items():
+        if size != 'source':
+            url = field_file.storage.url(name)
+            urls[size] = request.build_absolute_uri(url) if request else url
+    return urls
+
+
+@extend_schema_field({'type': 'object', 'additionalProperties': {'type': 'string', 'format': 'uri'}, 'nullable': True})
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Variant URLs of an image field by size, e.g. ``{"64": ..., "128": ...}``."""
+
+    def __init__(self, image_field: str, kind: str, **kwargs):
+        self.image_field = image_field
+        self.kind = kind
+        super().__init__(source='*', **kwargs)
+
+    def to_representation(self, instance):
+        return get_variant_urls(instance, self.image_field, self.kind, self.context.get('request'))
+
+
+@extend_schema_field({'type': 'array', 'items': {'type': 'integer', 'minimum': 0, 'maximum': 127}, 'nullable': True})
+class WaveformField(serializers.ReadOnlyField):
+    """Peaks of an audio waveform, 0 to 127, from the int8 array stored on the row."""
+
+    def to_representation(self, value):
+        return list(bytes(value))
+
+
+class MediaJobSerializer(serializers.ModelSerializer):
+    updated_at = TimestampField(read_only=True)
+
+    class Meta:
+        model = MediaJob
+        fields = ('kind', 'status', 'attempts', 'error', 'updated_at')
+
+
+class MediaStatusSerializer(serializers.ModelSerializer):
+    content_id = serializers.IntegerField(source='id', read_only=True)
+    jobs = MediaJobSerializer(source='media_jobs', many=True, read_only=True)
+
+    class Meta:
+        model = Content
+        fields = ('content_id', 'media_status', 'jobs')
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    created_at = TimestampField(read_only=True)
+    expires_at = TimestampField(read_only=True)
+
+    class Meta:
+        model = UploadSession
+        fields = (
+            'id', 'purpose', 'filename', 'content_type', 'size', 'received', 'status', 'media', 'created_at',
+            'expires_at'
+        )
+        read_only_fields = ('received', 'status', 'media')
+
+    @staticmethod
+    def validate_size(value):
+        max_size = settings.UPLOAD_MAX_SIZE
+        if not value or value > max_size:
+            raise serializers.ValidationError(f'File size must be between 1 byte and {max_size // (1024 * 1024)} MB.')
+        return value
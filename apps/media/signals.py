@@ -0,0 +1,53 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.chat.models import Message
+from apps.content.models import Content
+from apps.content_plan.models import Subscription
+from apps.media.blobs import acquire_blob, release_blob
+from apps.media.delivery import reset_media_access
+from apps.media.jobs import enqueue_media_jobs, run_in_background
+from apps.media.processors import process_message_media
+from apps.media.variants import VARIANT_FIELDS, needs_variants, refresh_image_variants
+
+
+@receiver(post_save, sender=Content)
+def content_media_jobs(sender, instance, created, **kwargs):
+    if created and instance.media:
+        enqueue_media_jobs(instance)
+
+
+@receiver(post_save, sender=Message)
+def message_media(sender, instance, created, **kwargs):
+    if created and instance.media:
+        run_in_background(process_message_media, instance.pk)
+
+
+@receiver(post_save, sender=Content)
+@receiver(post_save, sender=Message)
+def media_blob_acquire(sender, instance, created, **kwargs):
+    if created and instance.media:
+        acquire_blob(instance.media.name)
+
+
+@receiver(post_delete, sender=Content)
+@receiver(post_delete, sender=Message)
+def media_blob_release(sender, instance, **kwargs):
+    if instance.media:
+        release_blob(instance.media.name)
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def subscription_media_access(sender, instance, **kwargs):
+    reset_media_access(instance.user_id)
+
+
+def image_variants(sender, instance, **kwargs):
+    for field_name, kind in VARIANT_FIELDS[sender]:
+        if needs_variants(instance, field_name):
+            run_in_background(refresh_image_variants, sender, instance.pk, field_name, kind)
+
+
+for model in VARIANT_FIELDS:
+    post_save.connect(image_variants, sender=model, dispatch_uid=f'image_variants_{model._meta.label_lower}')
@@ -0,0 +1,398 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
+
+import numpy as np
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from apps.accounts.serializers import UserListSerializer
+from apps.chat.models import Chat, Message
+from apps.chat.serializers import MessageSerializer
+from apps.content.models import Content
+from apps.content_plan.models import ContentPlan, Subscription
+from apps.media.jobs import get_status_group
+from apps.media.blobs import collect_blobs, store_blob
+from apps.media.models import MediaBlob, MediaJob, UploadSession
+from apps.media.placeholders import encode_blurhash
+from apps.media.waveforms import compute_peaks
+from apps.media.processors import (
+    PROCESSORS, build_master_playlist, extract_thumbnail, get_hls_ladder, probe_content, process_message_media
+)
+
+User = get_user_model()
+
+
+@override_settings(MEDIA_JOBS_EAGER=True, MEDIA_JOB_MAX_ATTEMPTS=3)
+class MediaJobTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='creator', email='creator@example.com', password='password!123')
+        self.client.force_authenticate(user=self.user)
+
+    def create_video(self):
+        return Content.objects.create(
+            user=self.user, media='contents/clip.mp4', media_type=Content.ContentMediaType.VIDEO,
+            type=Content.ContentType.CONTENT
+        )
+
+    def test_upload_is_processed_after_commit(self):
+        processor = mock.Mock()
+        processors = {MediaJob.Kind.PROBE: processor, MediaJob.Kind.THUMBNAIL: processor, MediaJob.Kind.HLS: processor}
+        with mock.patch.dict(PROCESSORS, processors):
+            with self.captureOnCommitCallbacks() as callbacks:
+                content = self.create_video()
+            self.assertEqual(content.media_status, Content.MediaStatus.PENDING)
+            processor.assert_not_called()
+            channel_layer = get_channel_layer()
+            channel_name = async_to_sync(channel_layer.new_channel)()
+            async_to_sync(channel_layer.group_add)(get_status_group(self.user.id), channel_name)
+            for callback in callbacks:
+                callback()
+        self.assertEqual(processor.call_count, 3)
+        event = async_to_sync(channel_layer.receive)(channel_name)
+        self.assertEqual(event['media_status'], Content.MediaStatus.READY)
+        response = self.client.get(reverse('content-media-status', args=[content.id]))
+        self.assertEqual(response.data['media_status'], Content.MediaStatus.READY)
+        self.assertEqual([job['status'] for job in response.data['jobs']], [MediaJob.Status.DONE] * 3)
+
+    def test_failing_job_is_retried_then_marked_failed(self):
+        processor = mock.Mock(side_effect=RuntimeError('corrupt stream'))
+        processors = {kind: mock.Mock() for kind in MediaJob.Kind}
+        with mock.patch.dict(PROCESSORS, processors, **{MediaJob.Kind.HLS: processor}):
+            with self.captureOnCommitCallbacks(execute=True):
+                content = self.create_video()
+        self.assertEqual(processor.call_count, 3)
+        job = MediaJob.objects.get(content=content, kind=MediaJob.Kind.HLS)
+        self.assertEqual((job.status, job.attempts, job.error), (MediaJob.Status.FAILED, 3, 'corrupt stream'))
+        content.refresh_from_db()
+        self.assertEqual(content.media_status, Content.MediaStatus.FAILED)
+
+    def test_media_status_is_private(self):
+        content = self.create_video()
+        other = User.objects.create_user(username='other', email='other@example.com', password='password!123')
+        self.client.force_authenticate(user=other)
+        response = self.client.get(reverse('content-media-status', args=[content.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_hls_ladder_never_upscales(self):
+        self.assertEqual(get_hls_ladder(1280, 720), [(426, 240, 400, 64), (854, 480, 1000, 96), (1280, 720, 2500, 128)])
+        self.assertEqual(get_hls_ladder(1080, 1920)[-1], (720, 1280, 2500, 128))
+        self.assertEqual(get_hls_ladder(320, 180), [(320, 180, 400, 64)])
+        self.assertEqual(
+            build_master_playlist(get_hls_ladder(320, 180)),
+            '#EXTM3U\n#EXT-X-VERSION:3\n#EXT-X-STREAM-INF:BANDWIDTH=464000,RESOLUTION=320x180\n180p.m3u8\n'
+        )
+
+
+@override_settings(MEDIA_JOBS_EAGER=True)
+class ImageVariantTests(APITestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        cache.clear()
+        self.user = User.objects.create_user(username='creator', email='creator@example.com', password='password!123')
+
+    @staticmethod
+    def create_image(name, size):
+        buffer = BytesIO()
+        Image.new('RGB', size, 'teal').save(buffer, format='JPEG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+    def test_avatar_variants_are_rendered_after_upload(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.profile_picture = self.create_image('avatar.jpg', (300, 200))
+            self.user.save()
+        self.user.refresh_from_db()
+        data = UserListSerializer(self.user).data
+        self.assertEqual(set(data['profile_picture_variants']), {'64', '128'})
+        self.assertEqual(len(data['profile_picture_placeholder']), 28)
+        with self.user.profile_picture.storage.open(self.user.profile_picture_variants['128']) as variant:
+            image = Image.open(variant)
+            self.assertEqual((image.format, image.size), ('WEBP', (128, 128)))
+
+    def test_missing_variants_are_rendered_on_first_read(self):
+        self.user.profile_picture = self.create_image('avatar.jpg', (300, 200))
+        self.user.save()  # its on-commit rendering never runs here, like an image uploaded before variants existed
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.assertEqual(UserListSerializer(self.user).data['cover_image_variants'], None)
+            self.assertEqual(UserListSerializer(self.user).data['profile_picture_variants'], {})
+            self.assertEqual(UserListSerializer(self.user).data['profile_picture_variants'], {})
+        self.assertEqual(len(callbacks), 1)
+        self.user.refresh_from_db()
+        self.assertEqual(set(UserListSerializer(self.user).data['profile_picture_variants']), {'64', '128'})
+
+    def test_blurhash_encoding(self):
+        image = Image.new('RGB', (32, 32), (0, 128, 255))
+        image.paste((255, 255, 255), (0, 0, 16, 32))
+        self.assertEqual(encode_blurhash(image, 4, 3), 'L~LrAT~kt4Icogoejta#fQfQfQfQ')
+
+    def test_content_image_variants_never_upscale(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            content = Content.objects.create(
+                user=self.user, media=self.create_image('photo.jpg', (800, 600)),
+                media_type=Content.ContentMediaType.IMAGE, type=Content.ContentType.CONTENT
+            )
+        content.refresh_from_db()
+        self.assertEqual(content.media_status, Content.MediaStatus.READY)
+        self.assertEqual((content.media_width, content.media_height, content.media_codec), (800, 600, 'jpeg'))
+        self.assertEqual(len(content.media_placeholder), 28)
+        with content.media.storage.open(content.media_variants['1080']) as variant:
+            self.assertEqual(Image.open(variant).size, (800, 600))
+
+
+class UploadSessionTests(APITestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root, UPLOAD_TEMP_DIR=f'{media_root}/uploads'))
+        self.user = User.objects.create_user(username='creator', email='creator@example.com', password='password!123')
+        self.client.force_authenticate(user=self.user)
+        self.data = bytes(range(256)) * 40
+
+    def create_session(self, purpose=UploadSession.Purpose.CONTENT):
+        response = self.client.post(
+            reverse('upload-create'), {'purpose': purpose, 'filename': '../clip.mp4', 'size': len(self.data)}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['id']
+
+    def put_chunk(self, upload_id, start, end):
+        return self.client.put(
+            reverse('upload-detail', args=[upload_id]), self.data[start:end], content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{end - 1}/{len(self.data)}'
+        )
+
+    def test_chunks_resume_and_finalize_into_content(self):
+        upload_id = self.create_session()
+        self.assertEqual(self.put_chunk(upload_id, 0, 4000).data['received'], 4000)
+        gap = self.put_chunk(upload_id, 6000, 8000)
+        self.assertEqual((gap.status_code, gap.data['received']), (status.HTTP_409_CONFLICT, 4000))
+        self.assertEqual(self.put_chunk(upload_id, 3000, 8000).data['received'], 8000)
+        early = self.client.post(reverse('upload-finalize', args=[upload_id]))
+        self.assertEqual(early.status_code, status.HTTP_409_CONFLICT)
+        self.put_chunk(upload_id, 8000, len(self.data))
+
+        response = self.client.post(reverse('upload-finalize', args=[upload_id]))
+        self.assertEqual(response.data['status'], UploadSession.Status.COMPLETE)
+        self.assertTrue(response.data['media'].startswith('blobs/') and response.data['media'].endswith('.mp4'))
+        with default_storage.open(response.data['media']) as file:
+            self.assertEqual(file.read(), self.data)
+
+        data = {'upload_id': upload_id, 'media_type': 'video', 'type': 'content', 'text': 'clip'}
+        content = self.client.post(reverse('content-list'), data)
+        self.assertEqual(content.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Content.objects.get(id=content.data['id']).media.name, response.data['media'])
+        reused = self.client.post(reverse('content-list'), data)
+        self.assertEqual(reused.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_ranges_and_other_users_are_refused(self):
+        upload_id = self.create_session()
+        oversized = self.client.put(
+            reverse('upload-detail', args=[upload_id]), self.data, content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes 0-{len(self.data)}/{len(self.data) + 1}'
+        )
+        self.assertEqual(oversized.status_code, status.HTTP_400_BAD_REQUEST)
+        other = User.objects.create_user(username='other', email='other@example.com', password='password!123')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.put_chunk(upload_id, 0, 100).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class MediaBlobTests(APITestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root, MEDIA_BLOB_GRACE_PERIOD=timedelta(0)))
+        self.user = User.objects.create_user(username='creator', email='creator@example.com', password='password!123')
+        self.client.force_authenticate(user=self.user)
+
+    def upload(self, name):
+        data = {'media': SimpleUploadedFile(name, b'same bytes'), 'media_type': 'video', 'type': 'content'}
+        response = self.client.post(reverse('content-list'), data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Content.objects.get(id=response.data['id'])
+
+    def test_identical_uploads_share_one_file_and_its_outputs(self):
+        first, second = self.upload('clip.mp4'), self.upload('copy.MP4')
+        self.assertEqual(first.media.name, second.media.name)
+        blob = MediaBlob.objects.get()
+        self.assertEqual((blob.name, blob.ref_count), (first.media.name, 2))
+        default_storage.save(f'{blob.name}_thumbnail.jpg', ImageVariantTests.create_image('frame.jpg', (64, 36)))
+        with mock.patch('apps.media.processors.run_ffmpeg') as run_ffmpeg:
+            extract_thumbnail(first)
+            extract_thumbnail(second)
+        run_ffmpeg.assert_called_once()
+        second.refresh_from_db()
+        self.assertEqual(second.thumbnail.name, f'{blob.name}_thumbnail.jpg')
+        self.assertEqual(second.media_placeholder, MediaBlob.objects.get().outputs['placeholder'])
+
+    def test_probe_is_stored_and_cached_by_hash(self):
+        first, second = self.upload('clip.mp4'), self.upload('clip.mp4')
+        probe = {
+            'streams': [{
+                'codec_type': 'video', 'codec_name': 'h264', 'width': 1920, 'height': 1080,
+                'side_data_list': [{'rotation': -90}],
+            }],
+            'format': {'duration': '12.5', 'bit_rate': '2500000'},
+        }
+        with mock.patch('apps.media.processors.ffmpeg.probe', return_value=probe) as ffprobe:
+            probe_content(first)
+            probe_content(second)
+        ffprobe.assert_called_once()
+        second.refresh_from_db()
+        self.assertEqual(
+            (second.media_width, second.media_height, second.media_duration, second.media_codec, second.media_bitrate),
+            (1080, 1920, 12.5, 'h264', 2500000)
+        )
+        self.assertEqual(second.media_aspect_ratio, 1080 / 1920)
+
+    def test_replacing_media_resets_outputs_and_moves_the_reference(self):
+        content = self.upload('clip.mp4')
+        Content.objects.filter(id=content.id).update(
+            thumbnail=f'{content.media.name}_thumbnail.jpg', stream=f'{content.media.name}_hls/master.m3u8',
+            media_width=1920, media_height=1080, media_placeholder='LEHV6nWB2yk8pyo0adR*.7kCMdnj'
+        )
+        data = {'media': SimpleUploadedFile('new.mp4', b'other bytes'), 'media_type': 'video'}
+        with mock.patch('apps.content.serializers.enqueue_media_jobs') as enqueue_media_jobs:
+            response = self.client.put(reverse('content-detail', args=[content.id]), data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        enqueue_media_jobs.assert_called_once()
+        old_name = content.media.name
+        content.refresh_from_db()
+        self.assertNotEqual(content.media.name, old_name)
+        self.assertFalse(content.thumbnail or content.stream)
+        self.assertEqual((content.media_width, content.media_height, content.media_placeholder), (None, None, None))
+        self.assertEqual(
+            dict(MediaBlob.objects.values_list('name', 'ref_count')), {old_name: 0, content.media.name: 1}
+        )
+
+    def test_blob_is_collected_after_its_last_reference(self):
+        first, second = self.upload('clip.mp4'), self.upload('clip.mp4')
+        first.delete()
+        self.assertEqual(collect_blobs(), 0)
+        second.delete()
+        self.assertEqual(collect_blobs(), 1)
+        self.assertFalse(default_storage.exists(second.media.name))
+
+
+class MediaDeliveryTests(APITestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root, UPLOAD_TEMP_DIR=f'{media_root}/uploads'))
+        cache.clear()
+        self.user = User.objects.create_user(username='creator', email='creator@example.com', password='password!123')
+        self.data = bytes(range(256)) * 4
+        self.name = default_storage.save('contents/clip.mp4', SimpleUploadedFile('clip.mp4', self.data))
+        self.url = reverse('media-file', args=[self.name])
+
+    def test_range_and_conditional_requests(self):
+        Content.objects.create(user=self.user, media=self.name, type=Content.ContentType.CONTENT)
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.data)}')
+        self.assertEqual(b''.join(response.streaming_content), self.data[10:20])
+        suffix = self.client.get(self.url, HTTP_RANGE='bytes=-4')
+        self.assertEqual(b''.join(suffix.streaming_content), self.data[-4:])
+        unsatisfiable = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.data)}-')
+        self.assertEqual(unsatisfiable.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_content_plan_media_is_gated(self):
+        plan = ContentPlan.objects.create(user=self.user, name='Plan', banner='banners/plan.jpg', description='Plan')
+        Content.objects.create(user=self.user, media=self.name, content_plan=plan, type=Content.ContentType.CONTENT)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+        subscriber = User.objects.create_user(username='fan', email='fan@example.com', password='password!123')
+        self.client.force_login(subscriber)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+        Subscription.objects.create(user=subscriber, content_plan=plan)
+        with override_settings(MEDIA_ACCEL_REDIRECT_PREFIX='/protected-media/'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.name}')
+        self.assertEqual(response.content, b'')
+
+    def test_messages_naming_gated_media_do_not_grant_access(self):
+        plan = ContentPlan.objects.create(user=self.user, name='Plan', banner='banners/plan.jpg', description='Plan')
+        Content.objects.create(user=self.user, media=self.name, content_plan=plan, type=Content.ContentType.CONTENT)
+        outsider = User.objects.create_user(username='outsider', email='outsider@example.com', password='password!123')
+        chat = Chat.objects.create(owner=outsider)
+        chat.participants.add(outsider)
+        video = Message.MessageMediaTypeEnum.VIDEO
+        Message.objects.create(chat=chat, sender=outsider, media=self.name, media_type=video)
+        self.client.force_login(outsider)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+        UploadSession.objects.create(
+            user=self.user, purpose=UploadSession.Purpose.MESSAGE, filename='clip.mp4', size=len(self.data),
+            media=self.name, status=UploadSession.Status.USED
+        )
+        Message.objects.create(chat=chat, sender=self.user, media=self.name, media_type=video)
+        cache.clear()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+    def test_unattached_uploads_are_only_served_to_their_uploader(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+        UploadSession.objects.create(
+            user=self.user, purpose=UploadSession.Purpose.CONTENT, filename='clip.mp4', size=len(self.data),
+            media=self.name, status=UploadSession.Status.COMPLETE
+        )
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        banner = default_storage.save('banners/plan.jpg', SimpleUploadedFile('plan.jpg', self.data))
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('media-file', args=[banner])).status_code, status.HTTP_200_OK)
+
+    def test_partial_uploads_are_not_served(self):
+        default_storage.save('uploads/session.part', SimpleUploadedFile('session.part', self.data))
+        self.assertEqual(self.client.get(reverse('media-file', args=['uploads/session.part'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('media-file', args=['../secret'])).status_code, 404)
+
+
+class WaveformTests(APITestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root, WAVEFORM_BUCKETS=4))
+        self.user = User.objects.create_user(username='creator', email='creator@example.com', password='password!123')
+
+    def test_peaks_are_scaled_to_the_loudest_bucket(self):
+        samples = np.array([0, 32767, -16384, 0, 0, 0, -32768, 8192], dtype=np.int16)
+        self.assertEqual(compute_peaks(samples, 4).tolist(), [126, 63, 0, 127])
+        self.assertEqual(compute_peaks(samples[:5], 2).tolist(), [127, 63])
+        self.assertEqual(compute_peaks(np.array([], dtype=np.int16), 3).tolist(), [0, 0, 0])
+
+    def test_voice_message_waveform_is_stored_once_per_upload(self):
+        chat = Chat.objects.create(owner=self.user)
+        media = store_blob(SimpleUploadedFile('voice.ogg', b'voice bytes')).name
+        voice = Message.MessageMediaTypeEnum.VOICE
+        messages = [
+            Message.objects.create(chat=chat, sender=self.user, media=media, media_type=voice) for _ in range(2)
+        ]
+        probe = {'streams': [{'codec_type': 'audio', 'codec_name': 'opus'}], 'format': {'duration': '3.2'}}
+        samples = np.array([0, 1000, -4000, 2000], dtype=np.int16)
+        with mock.patch('apps.media.processors.ffmpeg.probe', return_value=probe), \
+                mock.patch('apps.media.processors.decode_audio', return_value=samples) as decode_audio:
+            for message in messages:
+                process_message_media(message.id)
+        decode_audio.assert_called_once()
+        message = Message.objects.get(id=messages[1].id)
+        self.assertEqual(MessageSerializer(message).data['media_waveform'], [0, 31, 127, 63])
+        self.assertEqual((message.media_duration, message.media_codec), (3.2, 'opus'))
@@ -0,0 +1,168 @@
+import hashlib
+import os
+import re
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from apps.media.blobs import store_blob
+from apps.media.models import UploadSession
+
+READ_BLOCK_SIZE = 64 * 1024
+CONTENT_RANGE_PATTERN = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class UploadConflict(Exception):
+    """The chunk does not continue the bytes received so far; the client should resume from ``offset``."""
+
+    def __init__(self, offset: int):
+        super().__init__(f'Upload continues at byte {offset}')
+        self.offset = offset
+
+
+class HashingUploadMixin:
+    """Computes the SHA-256 of a multipart upload while it streams in and sets it as ``file.sha256``."""
+
+    def new_file(self, *args, **kwargs):
+        self.digest = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.digest.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(HashingUploadMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadMixin, TemporaryFileUploadHandler):
+    pass
+
+
+class TemporaryUpload(File):
+    """Lets FileSystemStorage move the assembled file into place instead of copying it."""
+
+    def temporary_file_path(self) -> str:
+        return self.file.name
+
+
+def create_session(user, purpose: str, filename: str, size: int, content_type: str = '') -> UploadSession:
+    session = UploadSession.objects.create(
+        user=user, purpose=purpose, filename=get_valid_filename(os.path.basename(filename)), size=size,
+        content_type=content_type
+    )
+    os.makedirs(settings.UPLOAD_TEMP_DIR, exist_ok=True)
+    with open(session.temporary_path, 'wb'):
+        pass
+    return session
+
+
+def parse_content_range(header: str | None, session: UploadSession) -> tuple[int, int] | None:
+    """``(start, length)`` of a ``bytes start-end/size`` header that fits the session, otherwise ``None``."""
+    match = CONTENT_RANGE_PATTERN.match(header or '')
+    if not match:
+        return None
+    start, end, total = map(int, match.groups())
+    if total != session.size or end < start or end >= total or end - start + 1 > settings.UPLOAD_CHUNK_MAX_SIZE:
+        return None
+    return start, end - start + 1
+
+
+def write_chunk(session: UploadSession, start: int, length: int, stream) -> int:
+    """
+    Streams a chunk into the session file at ``start`` in small blocks and returns the new offset. Chunks may
+    overlap bytes already received, so a chunk re-sent after a lost response is harmless; gaps are refused. Bytes
+    that arrived before a dropped connection are kept.
+    """
+    if session.status != UploadSession.Status.OPEN or start > session.received:
+        raise UploadConflict(session.received)
+    written = 0
+    with open(session.temporary_path, 'r+b') as target:
+        target.seek(start)
+        while stream is not None and written < length:
+            block = stream.read(min(READ_BLOCK_SIZE, length - written))
+            if not block:
+                break
+            target.write(block)
+            written += len(block)
+    updated = UploadSession.objects.filter(
+        id=session.id, status=UploadSession.Status.OPEN, received__gte=start
+    ).update(received=Greatest(F('received'), start + written), updated_at=timezone.now())
+    session.refresh_from_db(fields=['received', 'status'])
+    if not updated:
+        raise UploadConflict(session.received)
+    return session.received
+
+
+def finalize_session(session_id, user) -> UploadSession:
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(id=session_id, user=user)
+        if session.status != UploadSession.Status.OPEN:
+            return session
+        if session.received != session.size:
+            raise UploadConflict(session.received)
+        with open(session.temporary_path, 'rb') as assembled:
+            session.media = store_blob(TemporaryUpload(assembled), session.filename).name
+        if os.path.exists(session.temporary_path):
+            # The same bytes were stored before.
+            os.remove(session.temporary_path)
+        session.status = UploadSession.Status.COMPLETE
+        session.save(update_fields=['media', 'status', 'updated_at'])
+    return session
+
+
+def claim_upload(session_id, user, purpose: str) -> str | None:
+    """Marks a finalized upload as used and returns its media path, once per upload."""
+    claimed = UploadSession.objects.filter(
+        id=session_id, user=user, purpose=purpose, status=UploadSession.Status.COMPLETE
+    ).update(status=UploadSession.Status.USED)
+    return UploadSession.objects.values_list('media', flat=True).get(id=session_id) if claimed else None
+
+
+def record_message_upload(user, name: str) -> UploadSession:
+    """Records media uploaded in one request for chat messages, so only its uploader can attach it to a message."""
+    size = default_storage.size(name)
+    return UploadSession.objects.create(
+        user=user, purpose=UploadSession.Purpose.MESSAGE, filename=os.path.basename(name), size=size, received=size,
+        status=UploadSession.Status.COMPLETE, media=name
+    )
+
+
+def claim_message_media(user, name: str) -> bool:
+    """
+    Whether ``name`` was uploaded by ``user`` for chat messages; marks the upload used. A message may only point at
+    such media, as message media is served to chat participants.
+    """
+    return UploadSession.objects.filter(
+        user=user, purpose=UploadSession.Purpose.MESSAGE, media=name,
+        status__in=[UploadSession.Status.COMPLETE, UploadSession.Status.USED]
+    ).update(status=UploadSession.Status.USED) > 0
+
+
+def delete_session(session: UploadSession) -> None:
+    if session.status == UploadSession.Status.OPEN and os.path.exists(session.temporary_path):
+        os.remove(session.temporary_path)
+    session.delete()
+
+
+def expire_sessions() -> int:
+    sessions = UploadSession.objects.filter(expires_at__lt=timezone.now()).exclude(status=UploadSession.Status.USED)
+    expired = 0
+    for session in sessions.iterator():
+        delete_session(session)
+        expired += 1
+    return expired
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from apps.media.views import (
+    MediaStatusAPIView, UploadSessionAPIView, UploadSessionCreateAPIView, UploadSessionFinalizeAPIView
+)
+
+urlpatterns = [
+    path('contents/<int:content_id>/media/', MediaStatusAPIView.as_view(), name='content-media-status'),
+    path('uploads/', UploadSessionCreateAPIView.as_view(), name='upload-create'),
+    path('uploads/<uuid:upload_id>/', UploadSessionAPIView.as_view(), name='upload-detail'),
+    path('uploads/<uuid:upload_id>/finalize/', UploadSessionFinalizeAPIView.as_view(), name='upload-finalize'),
+]
@@ -0,0 +1,78 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from apps.accounts.models import User
+from apps.chat.models import Chat
+from apps.content_plan.models import ContentPlan
+from apps.media.placeholders import make_placeholder
+
+# Image fields that get variants as soon as they are saved; content images go through a MediaJob instead.
+VARIANT_FIELDS = {
+    User: (('profile_picture', 'avatar'), ('cover_image', 'cover')),
+    ContentPlan: (('banner', 'cover'),),
+    Chat: (('image', 'avatar'),),
+}
+
+
+def get_variants_field(field_name: str) -> str:
+    return f'{field_name}_variants'
+
+
+def get_placeholder_field(field_name: str) -> str:
+    return f'{field_name}_placeholder'
+
+
+def has_placeholder(model, field_name: str) -> bool:
+    placeholder_field = get_placeholder_field(field_name)
+    return any(field.name == placeholder_field for field in model._meta.concrete_fields)
+
+
+def needs_variants(instance, field_name: str) -> bool:
+    field_file = getattr(instance, field_name)
+    variants = getattr(instance, get_variants_field(field_name)) or {}
+    return bool(field_file) and variants.get('source') != field_file.name
+
+
+def render_variants(field_file, kind: str) -> dict[str, str]:
+    """Saves the sized renditions of ``kind`` next to the image; returns ``{size: name}`` plus the source name."""
+    spec = settings.IMAGE_VARIANTS[kind]
+    image_format = settings.IMAGE_VARIANT_FORMAT
+    with field_file.open('rb') as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image.load()
+    if image.mode not in ('RGB', 'RGBA') or image_format == 'JPEG':
+        image = image.convert('RGBA' if image.has_transparency_data and image_format != 'JPEG' else 'RGB')
+    root = os.path.splitext(field_file.name)[0]
+    extension = 'jpg' if image_format == 'JPEG' else image_format.lower()
+    variants = {'source': field_file.name}
+    for size in spec['sizes']:
+        if spec['crop']:
+            variant = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        else:
+            width = min(size, image.width)
+            variant = image.resize((width, max(1, round(image.height * width / image.width))), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        variant.save(buffer, format=image_format, quality=settings.IMAGE_VARIANT_QUALITY)
+        name = f'{root}_{size}.{extension}'
+        field_file.storage.delete(name)
+        variants[str(size)] = field_file.storage.save(name, ContentFile(buffer.getvalue()))
+    return variants
+
+
+def refresh_image_variants(model, pk, field_name: str, kind: str) -> dict | None:
+    """Renders the variants, and the placeholder if the model has a field for it; returns the updated fields."""
+    instance = model.objects.filter(pk=pk).first()
+    field_file = getattr(instance, field_name) if instance else None
+    if not field_file:
+        return None
+    updates = {get_variants_field(field_name): render_variants(field_file, kind)}
+    if has_placeholder(model, field_name):
+        with field_file.open('rb') as image:
+            updates[get_placeholder_field(field_name)] = make_placeholder(image)
+    # Only store them if the image was not replaced meanwhile; the new upload schedules its own variants.
+    model.objects.filter(pk=pk, **{field_name: field_file.name}).update(**updates)
+    return updates
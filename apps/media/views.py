@@ -0,0 +1,131 @@
+from django.views import View
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from apps.content.models import Content
+from apps.media.delivery import serve_media
+from apps.media.models import UploadSession
+from apps.media.serializers import MediaStatusSerializer, UploadSessionSerializer
+from apps.media.uploads import (
+    UploadConflict, create_session, delete_session, finalize_session, parse_content_range, write_chunk
+)
+
+
+class MediaStatusAPIView(APIView):
+    serializer_class = MediaStatusSerializer
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        responses={200: MediaStatusSerializer},
+        tags=['Media'],
+        description='Get the processing status of own content media. Completion is also pushed on ws/media/'
+    )
+    def get(self, request, content_id):
+        content = get_object_or_404(Content.objects.prefetch_related('media_jobs'), id=content_id, user=request.user)
+        return Response(self.serializer_class(content).data)
+
+
+class UploadSessionCreateAPIView(APIView):
+    serializer_class = UploadSessionSerializer
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        request=UploadSessionSerializer,
+        responses={201: UploadSessionSerializer},
+        tags=['Media'],
+        description='Start a resumable upload. Send the bytes with PUT uploads/<id>/ and then finalize it'
+    )
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session = create_session(request.user, **serializer.validated_data)
+        return Response(self.serializer_class(session).data, status=status.HTTP_201_CREATED)
+
+
+class UploadSessionAPIView(APIView):
+    serializer_class = UploadSessionSerializer
+    permission_classes = (IsAuthenticated,)
+
+    @staticmethod
+    def get_session(request, upload_id) -> UploadSession:
+        return get_object_or_404(UploadSession, id=upload_id, user=request.user)
+
+    @extend_schema(
+        responses={200: UploadSessionSerializer},
+        tags=['Media'],
+        description='Get an upload, `received` is the offset to resume from'
+    )
+    def get(self, request, upload_id):
+        return Response(self.serializer_class(self.get_session(request, upload_id)).data)
+
+    @extend_schema(
+        request={'application/octet-stream': {'type': 'string', 'format': 'binary'}},
+        parameters=[
+            OpenApiParameter(
+                'Content-Range', location=OpenApiParameter.HEADER, required=True,
+                description='bytes <start>-<end>/<size>, at most UPLOAD_CHUNK_MAX_SIZE bytes starting at or before '
+                            '`received`'
+            ),
+        ],
+        responses={200: UploadSessionSerializer, 409: UploadSessionSerializer},
+        tags=['Media'],
+        description='Upload a chunk of raw bytes. A 409 carries the offset to resume from'
+    )
+    def put(self, request, upload_id):
+        session = self.get_session(request, upload_id)
+        byte_range = parse_content_range(request.headers.get('Content-Range'), session)
+        if byte_range is None:
+            return Response({'detail': 'Invalid Content-Range header.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            write_chunk(session, *byte_range, request.stream)
+        except UploadConflict:
+            session.refresh_from_db()
+            return Response(self.serializer_class(session).data, status=status.HTTP_409_CONFLICT)
+        return Response(self.serializer_class(session).data)
+
+    @extend_schema(responses={204: None}, tags=['Media'], description='Cancel an upload')
+    def delete(self, request, upload_id):
+        delete_session(self.get_session(request, upload_id))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadSessionFinalizeAPIView(APIView):
+    serializer_class = UploadSessionSerializer
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        request=None,
+        responses={200: UploadSessionSerializer, 409: UploadSessionSerializer},
+        tags=['Media'],
+        description='Finish an upload once all bytes are received. Pass its id as `upload_id` when creating content '
+                    'or its `media` path in a chat message'
+    )
+    def post(self, request, upload_id):
+        get_object_or_404(UploadSession, id=upload_id, user=request.user)
+        try:
+            session = finalize_session(upload_id, request.user)
+        except UploadConflict:
+            session = UploadSession.objects.get(id=upload_id)
+            return Response(self.serializer_class(session).data, status=status.HTTP_409_CONFLICT)
+        return Response(self.serializer_class(session).data)
+
+
+class MediaFileView(View):
+    """
+    Serves MEDIA_ROOT after an access check. A plain Django view, since players and image tags send Accept headers
+    DRF content negotiation would refuse.
+    """
+
+    def get(self, request, name):
+        try:
+            authenticated = JWTAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            authenticated = None
+        user = authenticated[0] if authenticated else request.user
+        return serve_media(request, user, name)
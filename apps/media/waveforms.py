@@ -0,0 +1,17 @@
+import numpy as np
+
+
+def compute_peaks(samples: np.ndarray, buckets: int) -> np.ndarray:
+    """
+    Peak amplitude of ``buckets`` equal slices of 16-bit mono samples, scaled so the loudest peak is 127; quiet
+    recordings still draw a full-height waveform.
+    """
+    if not len(samples):
+        return np.zeros(buckets, dtype=np.int8)
+    amplitudes = np.abs(samples.astype(np.int32))
+    edges = np.linspace(0, len(amplitudes), buckets, endpoint=False).astype(np.intp)
+    peaks = np.maximum.reduceat(amplitudes, edges)
+    loudest = peaks.max()
+    if not loudest:
+        return np.zeros(buckets, dtype=np.int8)
+    return (peaks * 127 // loudest).astype(np.int8)
@@ -44,7 +44,7 @@ class SaveFCMDeviceView(APIView):
 
 class MediaCreateView(APIView):
     serializer_class = MediaSerializer
-    permission_classes = (AllowAny,)
+    permission_classes = (IsAuthenticated,)
 
     def post(self, request):
         serializer = self.serializer_class(data=request.data, context={'request': request})
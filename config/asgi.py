@@ -10,13 +10,14 @@ django.setup()
 
 
 from apps.chat.routing import websocket_urlpatterns
+from apps.media.routing import websocket_urlpatterns as media_websocket_urlpatterns
 from apps.chat.middleware import JwtAuthMiddleware
 
 application = ProtocolTypeRouter({
     'http': get_asgi_application(),
     'websocket': AllowedHostsOriginValidator(
         JwtAuthMiddleware(
-            URLRouter(websocket_urlpatterns)
+            URLRouter(websocket_urlpatterns + media_websocket_urlpatterns)
         )
     )
 })
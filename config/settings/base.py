@@ -14,6 +14,7 @@ LOCAL_APPS = [
     'apps.comments.apps.CommentsConfig',
     'apps.chat.apps.ChatConfig',
     'apps.notification.apps.NotificationConfig',
+    'apps.media.apps.MediaConfig',
 ]
 
 THIRD_PARTY_APPS = [
@@ -139,6 +140,23 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'feeds': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'feeds',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+# Must be shared by all workers (e.g. Redis) when running more than one process.
+FEED_CACHE_ALIAS = 'feeds'
+FEED_CACHE_TIMEOUT = 120
+
 CHANNEL_LAYERS = {
     'default': {
         'BACKEND': 'channels.layers.InMemoryChannelLayer',
@@ -156,3 +174,80 @@ FCM_DJANGO_SETTINGS = {
     "ONE_DEVICE_PER_USER": False,
     "DELETE_INACTIVE_DEVICES": True,
 }
+
+TIMELINE_MAX_LENGTH = 800
+TIMELINE_BACKFILL_SIZE = 100
+TIMELINE_FANOUT_LIMIT = 10000
+TIMELINE_BATCH_SIZE = 1000
+
+DISCOVER_CANDIDATE_LIMIT = 500
+DISCOVER_SOURCE_LIMIT = 300
+DISCOVER_WINDOW = timedelta(days=14)
+DISCOVER_RECENCY_HALF_LIFE = timedelta(hours=24)
+
+MEDIA_WORKERS = 2
+MEDIA_JOB_MAX_ATTEMPTS = 3
+MEDIA_JOB_RETRY_DELAY = 5
+MEDIA_JOB_TIMEOUT = timedelta(minutes=10)
+MEDIA_JOBS_EAGER = False
+
+# (height, video bitrate, audio bitrate) per HLS rendition, in kbit/s
+HLS_RENDITIONS = (
+    (240, 400, 64),
+    (480, 1000, 96),
+    (720, 2500, 128),
+)
+HLS_SEGMENT_SECONDS = 4
+
+# Sizes are the square side when cropping, otherwise the maximum width
+IMAGE_VARIANTS = {
+    'avatar': {'sizes': (64, 128), 'crop': True},
+    'cover': {'sizes': (720,), 'crop': False},
+    'feed': {'sizes': (1080,), 'crop': False},
+}
+IMAGE_VARIANT_FORMAT = 'WEBP'
+IMAGE_VARIANT_QUALITY = 80
+
+# BlurHash placeholders: the size images are shrunk to before encoding and the (x, y) number of components.
+PLACEHOLDER_SIZE = 32
+PLACEHOLDER_COMPONENTS = (4, 3)
+
+# Voice messages and audio content store this many int8 peaks, decoded from audio resampled to this rate.
+WAVEFORM_BUCKETS = 100
+WAVEFORM_SAMPLE_RATE = 8000
+
+UPLOAD_TEMP_DIR = os.path.join(MEDIA_ROOT, 'uploads')
+UPLOAD_MAX_SIZE = 200 * 1024 * 1024
+UPLOAD_CHUNK_MAX_SIZE = 8 * 1024 * 1024
+UPLOAD_SESSION_TTL = timedelta(hours=24)
+
+FILE_UPLOAD_HANDLERS = [
+    'apps.media.uploads.HashingMemoryFileUploadHandler',
+    'apps.media.uploads.HashingTemporaryFileUploadHandler',
+]
+MEDIA_BLOB_GRACE_PERIOD = timedelta(days=1)
+
+# Media is served by MediaFileView after an access check. Set one of these to let nginx (an internal location
+# aliased to MEDIA_ROOT) or Apache/lighttpd send the file instead of Django.
+MEDIA_ACCEL_REDIRECT_PREFIX = config('MEDIA_ACCEL_REDIRECT_PREFIX', default=None)
+MEDIA_SENDFILE_HEADER = config('MEDIA_SENDFILE_HEADER', default=None)
+MEDIA_CACHE_MAX_AGE = 60 * 60
+
+RECOMMENDATION_LIMIT = 200
+RECOMMENDATION_BATCH_SIZE = 1000
+
+RELATED_CONTENT_LIMIT = 20
+RELATED_SOURCE_LIMIT = 500
+RELATED_WINDOW = timedelta(days=30)
+
+TAG_ID_CACHE_SIZE = 10000
+
+VIEW_COUNT_FLUSH_INTERVAL = 10
+VIEW_COUNT_FLUSH_SIZE = 1000
+
+SEEN_FILTER_SIZE = 4096
+SEEN_FILTER_CAPACITY = 2000
+
+TRENDING_WINDOW = timedelta(hours=48)
+TRENDING_HALF_LIFE = timedelta(hours=6)
+TRENDING_LIMIT = 100
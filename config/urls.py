@@ -4,6 +4,7 @@ from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 
+from apps.media.views import MediaFileView
 from config.handlers import *
 
 urlpatterns = [
@@ -19,10 +20,12 @@ urlpatterns = [
     path('api/', include('apps.comments.urls')),
     path('api/', include('apps.chat.urls')),
     path('api/', include('apps.notification.urls')),
+    path('api/', include('apps.media.urls')),
+
+    path(f'{settings.MEDIA_URL.strip("/")}/<path:name>', MediaFileView.as_view(), name='media-file'),
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
 
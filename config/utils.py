@@ -21,6 +21,55 @@ class CustomAutoField(models.IntegerField):
         return super().pre_save(model_instance, add)
 
 
+class DynamicFieldsMixin:
+    """
+    Lets clients prune serializer output with ``?fields=id,user,...`` and ``?expand=user,...``.
+
+    Without ``fields`` everything is rendered as before. With it, only the listed fields are kept, and relations
+    named in ``Meta.expandable_fields`` are rendered as primary keys unless they are listed in ``expand`` too.
+    ``optimize_queryset`` applies the same selection to ``Meta.select_related_fields`` and
+    ``Meta.prefetch_related_fields`` so pruned relations are not loaded either.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested, expanded = self.get_field_selection(self.context.get('request'))
+        if requested is None:
+            return
+        expandable = getattr(self.Meta, 'expandable_fields', ())
+        for name in list(self.fields):
+            if name not in requested:
+                self.fields.pop(name)
+            elif name in expandable and name not in expanded:
+                many = isinstance(self.fields[name], serializers.ListSerializer)
+                self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, many=many)
+
+    @staticmethod
+    def get_field_selection(request) -> tuple[set | None, set]:
+        if request is None or request.method != 'GET':
+            return None, set()
+
+        def parse(value):
+            return {name.strip() for name in value.split(',') if name.strip()}
+
+        fields = request.query_params.get('fields')
+        return (parse(fields) if fields else None), parse(request.query_params.get('expand', ''))
+
+    @classmethod
+    def optimize_queryset(cls, queryset, request):
+        requested, expanded = cls.get_field_selection(request)
+        expandable = getattr(cls.Meta, 'expandable_fields', ())
+        select_related = [
+            name for name in getattr(cls.Meta, 'select_related_fields', ())
+            if requested is None or name in requested and (name in expanded or name not in expandable)
+        ]
+        prefetch_related = [
+            name for name in getattr(cls.Meta, 'prefetch_related_fields', ())
+            if requested is None or name in requested
+        ]
+        return queryset.select_related(*select_related).prefetch_related(*prefetch_related)
+
+
 class TimestampField(serializers.IntegerField):
 
     def to_representation(self, value) -> int:
@@ -36,3 +85,25 @@ PAGINATION_PARAMETERS = [
         description='Number of results to return per page.'
     )
 ]
+
+CURSOR_PAGINATION_PARAMETERS = [
+    OpenApiParameter(
+        'cursor', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY,
+        description='The pagination cursor value.'
+    ),
+    OpenApiParameter(
+        'page_size', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY,
+        description='Number of results to return per page.'
+    )
+]
+
+DYNAMIC_FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        'fields', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY,
+        description='Comma separated list of fields to return.'
+    ),
+    OpenApiParameter(
+        'expand', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY,
+        description='Comma separated list of relations to render in full when fields is given.'
+    )
+]